@@ -67,8 +67,11 @@ with DAG(
     #     """,
     # )
 
-    analyze = BashOperator(
-        task_id="db_analyze",
+    # Replaces the old full-table ANALYZE: dashboards read the
+    # bina_price_stats materialized view, refreshed only when enough
+    # listings changed (autovacuum keeps planner stats current).
+    aggregates = BashOperator(
+        task_id="refresh_aggregates",
         bash_command=f"""
         cd {PROJECT}
 
@@ -77,25 +80,83 @@ with DAG(
         source {ENV}
         set +o allexport
 
-        {PYTHON} - << 'EOF'
-import os, psycopg2
-conn = psycopg2.connect(
-    host=os.environ["DB_HOST"],
-    port=os.environ["DB_PORT"],
-    dbname=os.environ["DB_NAME"],
-    user=os.environ["DB_USER"],
-    password=os.environ["DB_PASSWORD"],
-)
-cur = conn.cursor()
-cur.execute("ANALYZE bina_apartments;")
-conn.commit()
-cur.close()
-conn.close()
-EOF
-
-        exit 0
+        export PYTHONPATH={PROJECT}/src
+
+        {PYTHON} {SRC}/aggregates.py
+        """,
+    )
+
+    completion_stats = BashOperator(
+        task_id="completion_stats",
+        bash_command=f"""
+        cd {PROJECT}
+
+        # Load .env variables
+        set -o allexport
+        source {ENV}
+        set +o allexport
+
+        export PYTHONPATH={PROJECT}/src
+
+        echo "[AIRFLOW] Draining completion events into scrape_stats..."
+        {PYTHON} {SRC}/completion_consumer.py
+        """,
+    )
+
+    reconcile = BashOperator(
+        task_id="reconcile_orphans",
+        bash_command=f"""
+        cd {PROJECT}
+
+        # Load .env variables
+        set -o allexport
+        source {ENV}
+        set +o allexport
+
+        export PYTHONPATH={PROJECT}/src
+
+        echo "[AIRFLOW] Re-enqueueing orphaned unscraped listings..."
+        {PYTHON} {SRC}/reconciler.py
+        """,
+    )
+
+    refresh = BashOperator(
+        task_id="schedule_refreshes",
+        bash_command=f"""
+        cd {PROJECT}
+
+        # Load .env variables
+        set -o allexport
+        source {ENV}
+        set +o allexport
+
+        export PYTHONPATH={PROJECT}/src
+
+        echo "[AIRFLOW] Scheduling detail refreshes for the stalest listings..."
+        {PYTHON} {SRC}/refresh_scheduler.py
+        """,
+    )
+
+    # Flags runs whose throughput fell well below the rolling
+    # baseline; failing the task makes the regression visible
+    run_report = BashOperator(
+        task_id="run_regression_report",
+        bash_command=f"""
+        cd {PROJECT}
+
+        # Load .env variables
+        set -o allexport
+        source {ENV}
+        set +o allexport
+
+        export PYTHONPATH={PROJECT}/src
+
+        {PYTHON} {SRC}/run_ledger.py --hours 24 --fail-on-regression
         """,
+        retries=0,
     )
 
-    # fast >> detail >> analyze
-    fast >> analyze
+    # fast >> detail >> aggregates
+    fast >> aggregates
+    fast >> reconcile >> refresh
+    fast >> run_report
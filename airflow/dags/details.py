@@ -1,34 +1,66 @@
-from airflow.operators.bash import BashOperator
-from datetime import datetime, timedelta
-from airflow import DAG
-
-# Number of DAGs you want
-SCRAPER_COUNT = 2
-
-for i in range(1, SCRAPER_COUNT + 1):
-    dag_id = f"detail_scraper_singleton_{i}"
-
-    default_args = {
-        "owner": "airflow",
-        "depends_on_past": False,
-        "retries": 0,
-    }
-
-    dag = DAG(
-        dag_id=dag_id,
-        default_args=default_args,
-        start_date=datetime(2025, 1, 1),
-        schedule_interval="* * * * *",  # every minute
-        catchup=False,
-        max_active_runs=1,
-    )
-
-    with dag:
-        BashOperator(
-            task_id=f"run_detail_scraper_{i}",
-            bash_command=f"python /opt/Etl_server_project_1/src/bina/detail_scraper.py",
-            execution_timeout=timedelta(hours=1),
-            task_concurrency=1,
-        )
-
-    globals()[dag_id] = dag
+#details.py file
+# Detail worker autoscaler: every minute a controller task reads the
+# depth of listing_queue and the per-worker throughput recorded in
+# scrape_runs (src/bina/autoscale.py), and the detail_worker task is
+# mapped over that many workers, up to BINA_AUTOSCALE_MAX_WORKERS.
+# An empty queue maps zero workers, so idle minutes cost one query.
+import re
+import subprocess
+from datetime import datetime, timedelta
+
+from airflow import DAG
+from airflow.decorators import task
+from airflow.operators.bash import BashOperator
+
+PROJECT = "/opt/Etl_server_project_1"
+ENV = f"{PROJECT}/.env"
+SRC = f"{PROJECT}/src/bina"
+
+# FINAL FIX — THIS PYTHON HAS SELENIUM INSTALLED
+PYTHON = "/home/airflow/.local/bin/python3"
+
+LOAD_ENV = f"""
+cd {PROJECT}
+
+# Load .env variables
+set -o allexport
+source {ENV}
+set +o allexport
+
+export PYTHONPATH={PROJECT}/src
+"""
+
+DEFAULTS = {
+    "owner": "airflow",
+    "depends_on_past": False,
+    "retries": 0,
+}
+
+with DAG(
+    dag_id="detail_scraper_autoscaled",
+    description="Detail workers sized by listing_queue depth",
+    default_args=DEFAULTS,
+    start_date=datetime(2025, 1, 1),
+    schedule_interval="* * * * *",  # every minute
+    catchup=False,
+    max_active_runs=1,
+) as dag:
+
+    @task
+    def plan_workers():
+        """One bash_command per worker to launch (empty list → none)."""
+        out = subprocess.run(
+            ["bash", "-c", f"{LOAD_ENV}\n{PYTHON} {SRC}/autoscale.py"],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        print(out)
+        workers = int(re.findall(r"^WORKERS=(\d+)$", out, re.M)[-1])
+        return [
+            f"{LOAD_ENV}\necho \"[AIRFLOW] Detail worker {i}\"\n{PYTHON} {SRC}/detail_scraper.py"
+            for i in range(1, workers + 1)
+        ]
+
+    BashOperator.partial(
+        task_id="detail_worker",
+        execution_timeout=timedelta(hours=1),
+    ).expand(bash_command=plan_workers())
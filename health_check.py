@@ -2,7 +2,9 @@
 import os
 import time
 import psutil
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
+
+from bina import metrics
 
 # ========================
 # CONFIGURATION
@@ -73,6 +75,19 @@ def health():
     return jsonify(response), (200 if healthy else 500)
 
 
+@app.route("/metrics")
+def prometheus_metrics():
+    """
+    Scraper metrics in Prometheus text format.
+
+    Merged from the snapshot files bina.metrics writes
+    (BINA_METRICS_DIR), summed per service across processes.
+    """
+    counters, histograms = metrics.collect()
+    return Response(metrics.render(counters, histograms),
+                    mimetype="text/plain; version=0.0.4")
+
+
 # ========================
 # ENTRY POINT
 # ========================
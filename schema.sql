@@ -27,5 +27,69 @@ CREATE TABLE IF NOT EXISTS bina_apartments (
     contact_number TEXT,
     view_count INTEGER,
     is_constructed BOOLEAN,
-    is_scraped BOOLEAN DEFAULT FALSE
+    is_scraped BOOLEAN DEFAULT FALSE,
+
+    -- sha1 of the card fields (bina.helper.card_fingerprint)
+    content_hash TEXT
+);
+
+-- Existing deployments: the fingerprint column was added later.
+ALTER TABLE bina_apartments ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Per-minute detail scraper throughput, written by bina.completion_consumer.
+-- One row per (minute, drained batch); sum the counters when querying.
+CREATE TABLE IF NOT EXISTS scrape_stats (
+    minute TIMESTAMP NOT NULL,
+    successes INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    p50_ms FLOAT,
+    p95_ms FLOAT,
+    written_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS scrape_stats_minute_idx ON scrape_stats (minute);
+
+-- Append-only price / view history, one partition per month.
+-- Partitions are created on demand by bina.history.ensure_partitions.
+CREATE TABLE IF NOT EXISTS bina_listing_history (
+    listing_id BIGINT NOT NULL,
+    observed_at TIMESTAMP NOT NULL,
+    price_azn INTEGER,
+    view_count INTEGER,
+    source TEXT NOT NULL
+) PARTITION BY RANGE (observed_at);
+
+CREATE INDEX IF NOT EXISTS bina_listing_history_listing_idx
+    ON bina_listing_history (listing_id, observed_at DESC);
+
+-- Dashboard aggregates: price per sqm by area / rooms / owner type.
+-- Refreshed CONCURRENTLY by bina.aggregates when enough rows changed.
+CREATE MATERIALIZED VIEW IF NOT EXISTS bina_price_stats AS
+SELECT
+    location_area,
+    rooms,
+    owned_type,
+    COUNT(*) AS listings,
+    AVG(price_azn) AS avg_price_azn,
+    AVG(area_sqm) AS avg_area_sqm,
+    AVG(price_per_sqm) AS avg_price_per_sqm,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY price_per_sqm) AS median_price_per_sqm,
+    MAX(scraped_at) AS last_change_at
+FROM bina_apartments
+WHERE price_per_sqm IS NOT NULL
+GROUP BY location_area, rooms, owned_type;
+
+CREATE UNIQUE INDEX IF NOT EXISTS bina_price_stats_key
+    ON bina_price_stats (location_area, rooms, owned_type) NULLS NOT DISTINCT;
+
+CREATE TABLE IF NOT EXISTS bina_aggregate_refresh (
+    view_name TEXT PRIMARY KEY,
+    refreshed_at TIMESTAMP NOT NULL,
+    changed_rows INTEGER NOT NULL
 );
+
+-- Indexes and later schema changes are versioned migrations:
+--   PYTHONPATH=src python -m bina.migrations
+-- and verified against the pipeline's queries with:
+--   PYTHONPATH=src python -m bina.index_check
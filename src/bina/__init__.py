@@ -1,9 +1,48 @@
+# /opt/Etl_server_project_1/src/bina/__init__.py
+# Importing the package is free: submodules (and the selenium /
+# pika / psycopg2 stacks behind them) load on first attribute
+# access, e.g. `bina.metrics`, or through `python -m bina <cmd>`.
+
+import importlib
+
 __all__ = [
+    "aggregates",
+    "autoscale",
+    "browser",
+    "completion_consumer",
     "config",
+    "crawl_planner",
     "db",
-    "helpers",
-    "models",
-    "scraper",           
-    "scraper_each_item",
+    "detail_scraper",
+    "helper",
+    "history",
+    "html_archive",
+    "html_parsers",
+    "index_check",
+    "listing_producer",
+    "metrics",
+    "migrations",
+    "page_cache",
+    "parquet_export",
     "pipeline",
+    "profiling",
+    "rabbit",
+    "rate_limit",
+    "reconciler",
+    "reextract",
+    "refresh_scheduler",
+    "removal_prober",
+    "run_ledger",
+    "scraper",
+    "sitemap_discovery",
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,57 @@
+# /opt/Etl_server_project_1/src/bina/__main__.py
+# SINGLE CLI
+# ------------------------------------------------
+#   python -m bina <command> [args...]
+# Each command runs one module exactly as
+# `python -m bina.<module>` would, so only that module's
+# imports are paid for. Listing the commands imports nothing.
+# ------------------------------------------------
+
+import runpy
+import sys
+
+
+COMMANDS = {
+    "producer":    ("bina.listing_producer",    "Scroll the feed, upsert cards, publish detail jobs"),
+    "detail":      ("bina.detail_scraper",      "Consume detail jobs and scrape listing pages"),
+    "plan":        ("bina.crawl_planner",       "Sharded parallel feed crawl"),
+    "sitemap":     ("bina.sitemap_discovery",   "Discover listings from the sitemaps"),
+    "completions": ("bina.completion_consumer", "Aggregate completion events into scrape_stats"),
+    "aggregates":  ("bina.aggregates",          "Refresh dashboard aggregates"),
+    "history":     ("bina.history",             "Listing history maintenance and reports"),
+    "migrate":     ("bina.migrations",          "Apply pending schema migrations"),
+    "index-check": ("bina.index_check",         "Verify the hot queries use their indexes"),
+    "reconcile":   ("bina.reconciler",          "Re-publish listings lost between stages"),
+    "export":      ("bina.parquet_export",      "Incremental Parquet export"),
+    "refresh":     ("bina.refresh_scheduler",   "Queue the stalest listings for a refresh"),
+    "probe":       ("bina.removal_prober",      "Probe for removed listings"),
+    "reextract":   ("bina.reextract",           "Re-parse archived HTML"),
+    "runs":        ("bina.run_ledger",          "scrape_runs regression report"),
+    "autoscale":   ("bina.autoscale",           "Size the next wave of detail workers"),
+}
+
+
+def usage(out=sys.stdout):
+    print("usage: python -m bina <command> [args...]\n\ncommands:", file=out)
+    for name, (module, help_text) in COMMANDS.items():
+        print(f"  {name:12s} {help_text}", file=out)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        usage()
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"[bina] Unknown command: {argv[0]}\n", file=sys.stderr)
+        usage(sys.stderr)
+        return 2
+
+    module = COMMANDS[argv[0]][0]
+    sys.argv = [module, *argv[1:]]   # run_module swaps argv[0] for the file path
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
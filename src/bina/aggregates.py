@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/aggregates.py
+# DASHBOARD AGGREGATES REFRESH
+# ------------------------------------------------
+# Dashboards read bina_price_stats (materialized view,
+# a few hundred rows) instead of re-aggregating
+# bina_apartments. The view is refreshed CONCURRENTLY
+# (readers never block) only when enough listings changed
+# since the last refresh — scraped_at moves only on real
+# changes — or when it gets too old.
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import time
+
+from bina.config import settings
+from bina.db import get_conn, now_utc
+
+
+VIEWS = ("bina_price_stats",)
+
+
+def last_refresh(cur, view):
+    cur.execute(
+        "SELECT refreshed_at FROM bina_aggregate_refresh WHERE view_name = %s;",
+        (view,),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def changed_since(cur, ts):
+    if ts is None:
+        cur.execute("SELECT COUNT(*) FROM bina_apartments;")
+    else:
+        cur.execute("SELECT COUNT(*) FROM bina_apartments WHERE scraped_at > %s;", (ts,))
+    return cur.fetchone()[0]
+
+
+def refresh_view(view, force=False):
+    """Refresh one view if the change volume (or age) calls for it."""
+    conn = get_conn()
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        started = now_utc()
+        previous = last_refresh(cur, view)
+        changed = changed_since(cur, previous)
+        age = (started - previous).total_seconds() if previous else None
+
+        due = (
+            force
+            or previous is None
+            or changed >= settings.AGG_REFRESH_MIN_CHANGES
+            or (changed > 0 and age >= settings.AGG_REFRESH_MAX_AGE)
+        )
+        if not due:
+            print(f"[AGG] {view}: {changed} changed rows — below threshold, skipping")
+            return False
+
+        t0 = time.time()
+        cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view};")
+        cur.execute(
+            """
+            INSERT INTO bina_aggregate_refresh (view_name, refreshed_at, changed_rows)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (view_name) DO UPDATE SET
+                refreshed_at = EXCLUDED.refreshed_at,
+                changed_rows = EXCLUDED.changed_rows;
+            """,
+            (view, started, changed),
+        )
+        print(f"[AGG] {view}: refreshed ({changed} changed rows) in {time.time() - t0:.2f}s")
+        return True
+    except Exception as e:
+        print(f"[DB ERROR] AGGREGATE REFRESH FAILED ({view}): {e}")
+        raise
+    finally:
+        conn.close()
+
+
+def main(force=False):
+    for view in VIEWS:
+        refresh_view(view, force)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh dashboard aggregates by change volume")
+    parser.add_argument("--force", action="store_true", help="Refresh regardless of thresholds")
+    args = parser.parse_args()
+    main(args.force)
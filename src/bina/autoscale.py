@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/autoscale.py
+# DETAIL WORKER AUTOSCALER
+# ------------------------------------------------
+# Sizes the next wave of detail workers from the depth of
+# listing_queue and the items/sec one worker actually
+# achieved (median of the recent detail runs in
+# scrape_runs; rendered pages only, skips are counted
+# apart since migration 12). One worker drains at most
+#   min(DETAIL_SCRAPER_LIMIT, rate * DETAIL_RUN_SECONDS)
+# messages per run, so
+#   workers = ceil(depth / that), capped at the ceiling,
+# and an empty queue launches nothing. The last stdout
+# line is "WORKERS=<n>" for the Airflow controller DAG.
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import math
+import statistics
+
+from bina.config import settings
+from bina.db import get_conn
+
+
+def observed_rate(runs=settings.AUTOSCALE_RATE_RUNS, min_items=5):
+    """
+    Median items/sec of the last `runs` detail runs; None without
+    history. Runs from before migration 12 counted skips as items
+    and overstate the rate, so only runs that recorded skips
+    separately are used.
+    """
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT items_per_sec FROM scrape_runs
+            WHERE mode = 'detail' AND items >= %s
+              AND started_at >= (
+                  SELECT applied_at FROM bina_schema_migrations WHERE version = 12
+              )
+            ORDER BY started_at DESC
+            LIMIT %s;
+            """,
+            (min_items, runs),
+        )
+        rates = [row[0] for row in cur.fetchall() if row[0]]
+    finally:
+        conn.close()
+    return statistics.median(rates) if len(rates) >= 3 else None
+
+
+def workers_needed(depth, rate, ceiling,
+                   per_run_limit=settings.DETAIL_SCRAPER_LIMIT,
+                   run_seconds=settings.DETAIL_RUN_SECONDS):
+    if depth <= 0 or ceiling <= 0:
+        return 0
+    per_worker = max(1, min(per_run_limit, int(rate * run_seconds)))
+    return min(ceiling, math.ceil(depth / per_worker))
+
+
+def plan(ceiling=settings.AUTOSCALE_MAX_WORKERS):
+    from bina.rabbit import RabbitMQ
+
+    rabbit = RabbitMQ()
+    try:
+        depth = rabbit.queue_depth()
+    finally:
+        rabbit.close()
+
+    rate = None
+    if depth > 0:
+        try:
+            rate = observed_rate()
+        except Exception as e:
+            print(f"[AUTOSCALE] No run history ({e}); using the default rate")
+    source = "observed" if rate is not None else "default"
+    rate = rate or settings.AUTOSCALE_DEFAULT_RATE
+
+    workers = workers_needed(depth, rate, ceiling)
+    print(f"[AUTOSCALE] {settings.RABBIT_QUEUE}: {depth} ready, "
+          f"{rate:.2f} items/s per worker ({source}) → {workers} of max {ceiling} workers")
+    return workers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Size the next wave of detail workers")
+    parser.add_argument("--max-workers", type=int, default=settings.AUTOSCALE_MAX_WORKERS)
+    args = parser.parse_args()
+    print(f"WORKERS={plan(args.max_workers)}")
@@ -0,0 +1,148 @@
+# /opt/Etl_server_project_1/src/bina/browser.py
+# SHARED CHROMIUM FACTORY + PERSISTENT PROFILE POOL
+# ------------------------------------------------
+# The one get_driver() for the producer, the detail
+# scraper, the crawl planner and the benchmarks.
+# selenium is imported on first use, so modules that
+# only need the parsers or the DB don't pay for it.
+#
+# With BINA_BROWSER_PROFILES=1 each driver runs on one of
+# BINA_BROWSER_PROFILE_SLOTS persistent profiles under
+# BINA_BROWSER_PROFILE_DIR:
+#   slot-<n>/            --user-data-dir
+#   slot-<n>/cache/      --disk-cache-dir (bounded by
+#                        --disk-cache-size), so bina.az's JS,
+#                        CSS and fonts survive between runs
+#   slot-<n>.lock        flock held while a driver uses the
+#                        slot; released on quit() or when the
+#                        process dies, so crashes never leak it
+# A slot older than BINA_BROWSER_PROFILE_MAX_AGE_HOURS is
+# wiped before reuse. When every slot is busy the driver
+# falls back to a throwaway profile.
+# ------------------------------------------------
+
+from __future__ import annotations
+import fcntl
+import os
+import shutil
+import time
+
+from bina.config import settings
+
+
+CHROME_ARGS = (
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+    "--disable-blink-features=AutomationControlled",
+    "--lang=az-AZ",
+)
+
+# Left behind by a Chromium that didn't exit cleanly; they make the
+# next start refuse the profile. Safe to drop while we hold the flock.
+SINGLETON_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket")
+CREATED_STAMP = ".bina-created"
+
+
+# ===========================================================
+# PROFILE POOL
+# ===========================================================
+class ProfileSlot:
+    def __init__(self, root, index, lock_file):
+        self.index = index
+        self.path = os.path.join(root, f"slot-{index}")
+        self.cache_dir = os.path.join(self.path, "cache")
+        self.lock_file = lock_file
+
+    def prepare(self, max_age_hours):
+        """Wipe the slot when it's too old, clear stale singleton locks."""
+        stamp = os.path.join(self.path, CREATED_STAMP)
+        if os.path.exists(stamp) and time.time() - os.path.getmtime(stamp) > max_age_hours * 3600:
+            print(f"[BROWSER] Profile slot {self.index} expired — wiping")
+            shutil.rmtree(self.path, ignore_errors=True)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if not os.path.exists(stamp):
+            open(stamp, "w").close()
+        for name in SINGLETON_FILES:
+            try:
+                os.unlink(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+
+    def release(self):
+        if self.lock_file is not None:
+            self.lock_file.close()      # closing drops the flock
+            self.lock_file = None
+
+
+def acquire_slot(root=None, slots=None):
+    """First free profile slot (locked for this process), or None when all are busy."""
+    root = root or settings.BROWSER_PROFILE_DIR
+    slots = slots or settings.BROWSER_PROFILE_SLOTS
+    os.makedirs(root, exist_ok=True)
+
+    for index in range(slots):
+        lock_file = open(os.path.join(root, f"slot-{index}.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            continue
+        slot = ProfileSlot(root, index, lock_file)
+        slot.prepare(settings.BROWSER_PROFILE_MAX_AGE_HOURS)
+        return slot
+    return None
+
+
+# ===========================================================
+# DRIVER
+# ===========================================================
+def get_driver(persistent: bool | None = None):
+    """
+    persistent: run on a pooled profile with a warm disk cache
+    (default: BINA_BROWSER_PROFILES).
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    if persistent is None:
+        persistent = settings.BROWSER_PROFILES
+
+    opts = Options()
+    opts.binary_location = settings.CHROME_BINARY
+    if settings.HEADLESS:
+        opts.add_argument("--headless=new")
+    for arg in CHROME_ARGS:
+        opts.add_argument(arg)
+
+    slot = acquire_slot() if persistent else None
+    if persistent and slot is None:
+        print("[BROWSER] All profile slots busy — using a fresh profile")
+    if slot is not None:
+        opts.add_argument(f"--user-data-dir={slot.path}")
+        opts.add_argument(f"--disk-cache-dir={slot.cache_dir}")
+        opts.add_argument(f"--disk-cache-size={settings.BROWSER_DISK_CACHE_MB * 1024 * 1024}")
+
+    service = Service(settings.CHROMEDRIVER_PATH)
+    try:
+        driver = webdriver.Chrome(service=service, options=opts)
+    except Exception:
+        if slot is not None:
+            slot.release()
+        raise
+
+    if slot is not None:
+        quit_driver = driver.quit
+
+        def quit():
+            try:
+                quit_driver()
+            finally:
+                slot.release()
+
+        driver.quit = quit
+        driver.profile_slot = slot.index
+    return driver
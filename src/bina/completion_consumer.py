@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/completion_consumer.py
+# COMPLETION EVENTS → PER-MINUTE RUN STATISTICS
+# ----------------------------------------------
+# Drains detail_scraper_completed in batches, folds the
+# events into per-minute rows (successes, skips, errors,
+# p50/p95 latency) and COPYs them into scrape_stats.
+# Messages are acked only after the rows are committed.
+# ----------------------------------------------
+
+from __future__ import annotations
+import io
+import math
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from bina.config import settings
+from bina.db import get_conn
+from bina.helper import percentile
+from bina.rabbit import RabbitMQ, COMPLETION_QUEUE
+
+
+STATS_COLUMNS = ("minute", "successes", "skips", "errors", "p50_ms", "p95_ms")
+
+
+def aggregate(events: list[dict]) -> list[tuple]:
+    """
+    Fold completion events into one row per UTC minute.
+    Latency percentiles are computed over events that carry duration_ms.
+    """
+    buckets = defaultdict(lambda: {"success": 0, "skipped": 0, "error": 0, "lat": []})
+
+    for ev in events:
+        ts = ev.get("timestamp")
+        if ts is None:
+            continue
+        minute = datetime.utcfromtimestamp(ts).replace(second=0, microsecond=0)
+        b = buckets[minute]
+
+        status = ev.get("status")
+        if status in b:
+            b[status] += 1
+
+        if ev.get("duration_ms") is not None:
+            b["lat"].append(float(ev["duration_ms"]))
+
+    rows = []
+    for minute in sorted(buckets):
+        b = buckets[minute]
+        rows.append((
+            minute,
+            b["success"],
+            b["skipped"],
+            b["error"],
+            percentile(b["lat"], 50),
+            percentile(b["lat"], 95),
+        ))
+    return rows
+
+
+def copy_stats(rows: list[tuple]):
+    """Write aggregated rows into scrape_stats with a single COPY."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join("\\N" if v is None else str(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.copy_expert(
+            f"COPY scrape_stats ({', '.join(STATS_COLUMNS)}) FROM STDIN",
+            buf,
+        )
+        conn.commit()
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print("[DB ERROR] SCRAPE_STATS COPY FAILED:", e)
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(batch_size=settings.COMPLETION_BATCH_SIZE, max_seconds=120):
+    print(f"[STATS] START (batch_size={batch_size})")
+
+    rabbit = RabbitMQ()
+    start = time.time()
+    drained = 0
+    written = 0
+
+    try:
+        while time.time() - start < max_seconds:
+            events, last_tag = rabbit.get_batch(COMPLETION_QUEUE, batch_size)
+            if last_tag is None:
+                print("[STATS] Completion queue empty — stopping")
+                break
+
+            rows = aggregate(events)
+            if rows:
+                copy_stats(rows)
+            rabbit.ack_through(last_tag)
+
+            drained += len(events)
+            written += len(rows)
+            print(f"[STATS] Batch: {len(events)} events → {len(rows)} rows")
+    finally:
+        rabbit.close()
+
+    print(f"[STATS] DONE — {drained} events, {written} rows written")
+
+
+if __name__ == "__main__":
+    main()
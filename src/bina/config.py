@@ -15,7 +15,7 @@ from dotenv import load_dotenv
 # ===========================================================
 # LOAD ENVIRONMENT
 # ===========================================================
-ENV_PATH = "/opt/Etl_server_project_1/.env"
+ENV_PATH = os.getenv("BINA_ENV_FILE", "/opt/Etl_server_project_1/.env")
 
 if os.path.exists(ENV_PATH):
     load_dotenv(ENV_PATH)
@@ -58,9 +58,20 @@ class Settings:
     SCROLL_ROUNDS_LIMIT: int = int(
         os.getenv("BINA_SCROLL_ROUNDS_LIMIT", 20)
     )
-    SCROLL_SLEEP: float = float(
-        os.getenv("BINA_SCROLL_SLEEP", 1.0)
+    # Each round waits for new item cards (MutationObserver) for at most
+    # SCROLL_ROUND_TIMEOUT seconds; the whole scroll phase is capped by
+    # SCROLL_DEADLINE. A round ends SCROLL_SETTLE_MS after the last card.
+    SCROLL_ROUND_TIMEOUT: float = float(
+        os.getenv("BINA_SCROLL_ROUND_TIMEOUT", 8.0)
     )
+    SCROLL_SETTLE_MS: int = int(
+        os.getenv("BINA_SCROLL_SETTLE_MS", 300)
+    )
+    SCROLL_DEADLINE: float = float(
+        os.getenv("BINA_SCROLL_DEADLINE", 180.0)
+    )
+    # Emit cards after every scroll round instead of after the last one
+    PRODUCER_STREAMING: bool = os.getenv("BINA_PRODUCER_STREAMING", "0") == "1"
 
     # -----------------------------------------
     # SCRAPER LIMITS
@@ -71,6 +82,150 @@ class Settings:
     DETAIL_SCRAPER_LIMIT: int = int(
         os.getenv("DETAIL_SCRAPER_LIMIT", 200)
     )
+    # A detail worker exits after this many seconds (or the limit above)
+    DETAIL_RUN_SECONDS: int = int(
+        os.getenv("BINA_DETAIL_RUN_SECONDS", 300)
+    )
+    # src/main.py --initial / --incremental: new listings per run
+    MAX_LISTINGS_INITIAL: int = int(
+        os.getenv("BINA_MAX_LISTINGS_INITIAL", 100)
+    )
+    MAX_LISTINGS_INCREMENTAL: int = int(
+        os.getenv("BINA_MAX_LISTINGS_INCREMENTAL", 180)
+    )
+
+    # -----------------------------------------
+    # SHARDED CRAWL (crawl_planner)
+    # -----------------------------------------
+    # Comma-separated "<url> [first-last]" seeds; empty → BINA_BASE_URL
+    CRAWL_SEEDS: str = os.getenv("BINA_CRAWL_SEEDS", "")
+    # 0 → one worker per CPU
+    CRAWL_WORKERS: int = int(
+        os.getenv("BINA_CRAWL_WORKERS", 0)
+    )
+
+    # -----------------------------------------
+    # SITEMAP DISCOVERY
+    # -----------------------------------------
+    SITEMAP_URL: str = os.getenv(
+        "BINA_SITEMAP_URL",
+        "https://bina.az/sitemap.xml"
+    )
+    # Only follow child sitemaps whose URL contains this substring
+    SITEMAP_CHILD_FILTER: str = os.getenv("BINA_SITEMAP_CHILD_FILTER", "")
+
+    # Plain-HTTP fetches (sitemaps, probes) identify as a desktop browser
+    HTTP_USER_AGENT: str = os.getenv(
+        "BINA_HTTP_USER_AGENT",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+    )
+
+    # -----------------------------------------
+    # DASHBOARD AGGREGATES
+    # -----------------------------------------
+    # Refresh once this many listings changed since the last refresh,
+    # or when the last refresh is older than AGG_REFRESH_MAX_AGE seconds
+    AGG_REFRESH_MIN_CHANGES: int = int(
+        os.getenv("BINA_AGG_REFRESH_MIN_CHANGES", 200)
+    )
+    AGG_REFRESH_MAX_AGE: int = int(
+        os.getenv("BINA_AGG_REFRESH_MAX_AGE", 6 * 3600)
+    )
+
+    # -----------------------------------------
+    # ORPHAN RECONCILER
+    # -----------------------------------------
+    # Unscraped rows older than this are considered lost
+    RECONCILE_AGE_MINUTES: int = int(
+        os.getenv("BINA_RECONCILE_AGE_MINUTES", 60)
+    )
+    RECONCILE_BATCH: int = int(
+        os.getenv("BINA_RECONCILE_BATCH", 200)
+    )
+    # Publish rate (messages/sec) and backpressure limits
+    RECONCILE_RATE: float = float(
+        os.getenv("BINA_RECONCILE_RATE", 20)
+    )
+    RECONCILE_MAX_QUEUE_DEPTH: int = int(
+        os.getenv("BINA_RECONCILE_MAX_QUEUE_DEPTH", 1000)
+    )
+    RECONCILE_MAX_PER_RUN: int = int(
+        os.getenv("BINA_RECONCILE_MAX_PER_RUN", 5000)
+    )
+
+    # -----------------------------------------
+    # REFRESH SCHEDULER
+    # -----------------------------------------
+    # Max refresh jobs pushed per scheduler run
+    REFRESH_PER_WINDOW: int = int(
+        os.getenv("BINA_REFRESH_PER_WINDOW", 200)
+    )
+    # Never re-visit a listing more often than this
+    REFRESH_MIN_AGE_HOURS: float = float(
+        os.getenv("BINA_REFRESH_MIN_AGE_HOURS", 24)
+    )
+
+    # -----------------------------------------
+    # DETAIL PAGE CACHE (conditional GET)
+    # -----------------------------------------
+    PAGE_CACHE_ENABLED: bool = os.getenv("BINA_PAGE_CACHE", "0") == "1"
+    PAGE_CACHE_DIR: str = os.getenv(
+        "BINA_PAGE_CACHE_DIR",
+        "/opt/Etl_server_project_1/cache/pages"
+    )
+    PAGE_CACHE_MAX_MB: int = int(
+        os.getenv("BINA_PAGE_CACHE_MAX_MB", 512)
+    )
+
+    # -----------------------------------------
+    # RAW HTML ARCHIVE + OFFLINE RE-EXTRACTION
+    # -----------------------------------------
+    ARCHIVE_ENABLED: bool = os.getenv("BINA_HTML_ARCHIVE", "0") == "1"
+    ARCHIVE_DIR: str = os.getenv(
+        "BINA_ARCHIVE_DIR",
+        "/opt/Etl_server_project_1/archive/html"
+    )
+    # "gzip" or "zstd" (needs the zstandard package)
+    ARCHIVE_CODEC: str = os.getenv("BINA_ARCHIVE_CODEC", "gzip")
+    # 0 → one worker per CPU
+    REEXTRACT_WORKERS: int = int(
+        os.getenv("BINA_REEXTRACT_WORKERS", 0)
+    )
+    REEXTRACT_BATCH: int = int(
+        os.getenv("BINA_REEXTRACT_BATCH", 1000)
+    )
+
+    # -----------------------------------------
+    # REMOVED-LISTING PROBER
+    # -----------------------------------------
+    PROBE_CONCURRENCY: int = int(
+        os.getenv("BINA_PROBE_CONCURRENCY", 50)
+    )
+    PROBE_BATCH: int = int(
+        os.getenv("BINA_PROBE_BATCH", 1000)
+    )
+    PROBE_RECHECK_HOURS: float = float(
+        os.getenv("BINA_PROBE_RECHECK_HOURS", 24)
+    )
+
+    # -----------------------------------------
+    # PARQUET EXPORT
+    # -----------------------------------------
+    EXPORT_DIR: str = os.getenv(
+        "BINA_EXPORT_DIR",
+        "/opt/Etl_server_project_1/exports/bina_apartments"
+    )
+    EXPORT_CHUNK_SIZE: int = int(
+        os.getenv("BINA_EXPORT_CHUNK_SIZE", 20000)
+    )
+    EXPORT_COMPRESSION: str = os.getenv("BINA_EXPORT_COMPRESSION", "zstd")
+    # Re-read this far behind the watermark: rows can commit with an
+    # updated_at older than rows already exported (long transactions,
+    # planner shards), so a strict "after the watermark" misses them
+    EXPORT_LAG_SECONDS: int = int(
+        os.getenv("BINA_EXPORT_LAG_SECONDS", 300)
+    )
 
     # -----------------------------------------
     # DATABASE CONFIG
@@ -80,6 +235,8 @@ class Settings:
     DB_NAME: str = os.getenv("DB_NAME", "etlserver_db")
     DB_USER: str = os.getenv("DB_USER", "Aliyev_user")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
+    # Connections held by one DBClient pool (src/main.py pipeline)
+    DB_POOL_MAX: int = int(os.getenv("BINA_DB_POOL_MAX", 4))
 
     # -----------------------------------------
     # RABBITMQ CONFIG
@@ -90,6 +247,106 @@ class Settings:
     RABBIT_PASSWORD: str = os.getenv("RABBIT_PASSWORD", "")
     RABBIT_QUEUE: str = os.getenv("RABBIT_QUEUE", "listing_queue")
 
+    # -----------------------------------------
+    # COMPLETION STATS CONSUMER
+    # -----------------------------------------
+    COMPLETION_BATCH_SIZE: int = int(
+        os.getenv("BINA_COMPLETION_BATCH_SIZE", 500)
+    )
+
+    # -----------------------------------------
+    # RUN LEDGER (scrape_runs regression report)
+    # -----------------------------------------
+    LEDGER_BASELINE_RUNS: int = int(
+        os.getenv("BINA_LEDGER_BASELINE_RUNS", 20)
+    )
+    # Flag runs whose items/sec is this fraction below the baseline
+    LEDGER_REGRESSION_THRESHOLD: float = float(
+        os.getenv("BINA_LEDGER_REGRESSION_THRESHOLD", 0.3)
+    )
+
+    # -----------------------------------------
+    # SHARED RATE LIMIT (bina.rate_limit)
+    # -----------------------------------------
+    # "postgres" (all hosts), "file" (this host) or "off"
+    RATE_LIMIT_BACKEND: str = os.getenv("BINA_RATE_LIMIT_BACKEND", "postgres")
+    # Page fetches per second across every scraper process
+    RATE_LIMIT_RPS: float = float(
+        os.getenv("BINA_RATE_LIMIT_RPS", 2.0)
+    )
+    RATE_LIMIT_BURST: int = int(
+        os.getenv("BINA_RATE_LIMIT_BURST", 5)
+    )
+    RATE_LIMIT_FILE: str = os.getenv("BINA_RATE_LIMIT_FILE", "/tmp/bina_rate_limit.json")
+
+    # -----------------------------------------
+    # DETAIL WORKER AUTOSCALER (airflow/dags/details.py)
+    # -----------------------------------------
+    AUTOSCALE_MAX_WORKERS: int = int(
+        os.getenv("BINA_AUTOSCALE_MAX_WORKERS", 6)
+    )
+    # Per-worker items/sec used until scrape_runs has enough detail runs
+    AUTOSCALE_DEFAULT_RATE: float = float(
+        os.getenv("BINA_AUTOSCALE_DEFAULT_RATE", 0.2)
+    )
+    # Recent detail runs whose median items/sec is the observed rate
+    AUTOSCALE_RATE_RUNS: int = int(
+        os.getenv("BINA_AUTOSCALE_RATE_RUNS", 20)
+    )
+
+    # -----------------------------------------
+    # METRICS (bina.metrics → health_check /metrics)
+    # -----------------------------------------
+    # Under the project mount so the host's health_check sees the
+    # snapshots written by workers inside the Airflow containers
+    METRICS_DIR: str = os.getenv(
+        "BINA_METRICS_DIR",
+        "/opt/Etl_server_project_1/logs/metrics"
+    )
+    METRICS_FLUSH_SECONDS: float = float(
+        os.getenv("BINA_METRICS_FLUSH_SECONDS", 5)
+    )
+    # Snapshots of finished runs are dropped after this long
+    METRICS_RETENTION_HOURS: float = float(
+        os.getenv("BINA_METRICS_RETENTION_HOURS", 24)
+    )
+
+    # -----------------------------------------
+    # PROFILING (bina.profiling)
+    # -----------------------------------------
+    # "" (off) | "sample" | "cprofile"
+    PROFILE: str = os.getenv("BINA_PROFILE", "")
+    PROFILE_DIR: str = os.getenv(
+        "BINA_PROFILE_DIR",
+        "/opt/Etl_server_project_1/logs/profiles"
+    )
+    PROFILE_INTERVAL_MS: float = float(
+        os.getenv("BINA_PROFILE_INTERVAL_MS", 5)
+    )
+
+    # -----------------------------------------
+    # BROWSER (bina.browser)
+    # -----------------------------------------
+    CHROME_BINARY: str = os.getenv("BINA_CHROME_BINARY", "/usr/bin/chromium")
+    CHROMEDRIVER_PATH: str = os.getenv("BINA_CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
+    # Persistent profiles with a warm HTTP disk cache (see bina/browser.py)
+    BROWSER_PROFILES: bool = os.getenv("BINA_BROWSER_PROFILES", "0") == "1"
+    BROWSER_PROFILE_DIR: str = os.getenv(
+        "BINA_BROWSER_PROFILE_DIR",
+        "/opt/Etl_server_project_1/cache/chrome-profiles"
+    )
+    # At least the number of concurrent browsers (producer + detail workers + shards)
+    BROWSER_PROFILE_SLOTS: int = int(
+        os.getenv("BINA_BROWSER_PROFILE_SLOTS", 8)
+    )
+    BROWSER_DISK_CACHE_MB: int = int(
+        os.getenv("BINA_BROWSER_DISK_CACHE_MB", 256)
+    )
+    # Wipe a slot (cookies, storage, cache) once it is this old
+    BROWSER_PROFILE_MAX_AGE_HOURS: float = float(
+        os.getenv("BINA_BROWSER_PROFILE_MAX_AGE_HOURS", 7 * 24)
+    )
+
     # Toggle for headless Selenium
     HEADLESS: bool = True
 
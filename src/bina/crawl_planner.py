@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/crawl_planner.py
+# SHARDED PARALLEL CRAWL
+# ------------------------------------------------
+# Expands seed feeds (rent/sale, cities, room filters,
+# page ranges) into shards, crawls each shard in its own
+# process with its own browser, then merges everything
+# into one deduplicated upsert + publish stream.
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from bina.config import settings
+from bina.db import upsert_listings_fast
+from bina.rabbit import RabbitMQ
+from bina.history import append_history
+
+
+# ----------------------------------------------------------
+# PLAN
+# ----------------------------------------------------------
+def with_page(url: str, page: int) -> str:
+    """Set (or replace) the ?page= query parameter."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "page"]
+    if page > 1:
+        query.append(("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def parse_seed(line: str) -> list[str]:
+    """
+    One seed per line:  <url> [first-last]
+      https://bina.az/baki/kiraye/menziller
+      https://bina.az/baki/alqi-satqi/menziller?room_ids[]=2 1-5
+    """
+    fields = line.split()
+    url = fields[0]
+    if len(fields) == 1:
+        return [url]
+
+    first, _, last = fields[1].partition("-")
+    first = int(first)
+    last = int(last or first)
+    return [with_page(url, p) for p in range(first, last + 1)]
+
+
+def plan_shards(seed_lines: list[str]) -> list[str]:
+    shards = []
+    for line in seed_lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        for url in parse_seed(line):
+            if url not in shards:
+                shards.append(url)
+    return shards
+
+
+def load_seeds(path: str | None) -> list[str]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+    if settings.CRAWL_SEEDS:
+        return settings.CRAWL_SEEDS.split(",")
+    return [settings.BINA_BASE_URL]
+
+
+# ----------------------------------------------------------
+# WORKER (runs in a child process)
+# ----------------------------------------------------------
+def crawl_shard(url: str, limit: int) -> tuple[str, list[dict], int, float]:
+    """Crawl one feed URL in a private browser; returns the parsed rows."""
+    from bina.browser import get_driver
+    from bina.listing_producer import wait_for_first_cards, crawl_streaming, CrawlStats
+    from bina.html_archive import HtmlArchive
+    from bina import metrics, rate_limit
+
+    metrics.init("planner")
+
+    t0 = time.time()
+    rows = []
+    stats = CrawlStats()
+    driver = get_driver()
+    archive = HtmlArchive() if settings.ARCHIVE_ENABLED else None
+    try:
+        driver.set_script_timeout(settings.SCROLL_ROUND_TIMEOUT + 5)
+        rate_limit.acquire()
+        driver.get(url)
+        wait_for_first_cards(driver)
+        crawl_streaming(driver, rows.append, stats, limit, settings.SCROLL_ROUNDS_LIMIT, archive)
+    finally:
+        driver.quit()
+        if archive is not None:
+            archive.close()
+        # Pool workers exit without running atexit hooks
+        metrics.flush()
+
+    return url, rows, stats.errors, time.time() - t0
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(seeds_file=None, workers=None, limit=None):
+    shards = plan_shards(load_seeds(seeds_file))
+    workers = workers or settings.CRAWL_WORKERS or os.cpu_count() or 1
+    limit = limit or settings.FAST_SCRAPER_LIMIT
+
+    print(f"[PLANNER] START — {len(shards)} shards, {workers} workers, limit/shard={limit}")
+
+    rabbit = RabbitMQ()
+    seen = set()
+    published = 0
+    errors = 0
+    writes = {"inserted": 0, "updated": 0, "unchanged": 0}
+    start = time.time()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(crawl_shard, url, limit): url for url in shards}
+
+            for fut in as_completed(futures):
+                url = futures[fut]
+                try:
+                    _, rows, shard_errors, secs = fut.result()
+                except Exception as e:
+                    print(f"[PLANNER] ✗ SHARD FAILED {url}: {e}")
+                    errors += 1
+                    continue
+
+                errors += shard_errors
+                fresh = [r for r in rows if r["listing_id"] not in seen]
+                seen.update(r["listing_id"] for r in fresh)
+
+                written = upsert_listings_fast(fresh)
+                for r in fresh:
+                    status = written.get(r["listing_id"], "unchanged")
+                    writes[status] += 1
+                    if status != "unchanged":
+                        rabbit.publish({"listing_id": r["listing_id"], "url": r["url"]})
+                        published += 1
+
+                append_history(
+                    ({"listing_id": r["listing_id"], "price_azn": r["price_azn"]}
+                     for r in fresh if r["listing_id"] in written),
+                    "producer",
+                )
+
+                print(f"[PLANNER] ✓ {url}: {len(rows)} cards, {len(fresh)} unseen, "
+                      f"{len(written)} written in {secs:.1f}s")
+    finally:
+        rabbit.close()
+
+    print(f"[PLANNER] Writes: {writes['inserted']} new, {writes['updated']} changed, "
+          f"{writes['unchanged']} unchanged")
+    print(f"[PLANNER] DONE — {len(seen)} unique listings from {len(shards)} shards, "
+          f"{published} published, {errors} errors, {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded parallel bina.az crawl")
+    parser.add_argument("--seeds-file", help="One '<url> [first-last]' seed per line")
+    parser.add_argument("--workers", type=int, help="Process pool size (default: CPU count)")
+    parser.add_argument("--limit", type=int, help="Max cards per shard")
+    args = parser.parse_args()
+    main(args.seeds_file, args.workers, args.limit)
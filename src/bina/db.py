@@ -4,6 +4,8 @@
 #db.py file
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+from contextlib import contextmanager
 from datetime import datetime
 
 from bina.config import settings
@@ -26,6 +28,75 @@ def now_utc():
     return datetime.utcnow()
 
 
+class DBClient:
+    """
+    Pooled client for long-lived callers (src/main.py pipeline):
+    connections are opened once and reused across queries instead of
+    one connect per call like the module-level helpers below.
+    """
+
+    def __init__(self, maxconn=None):
+        self.pool = psycopg2.pool.ThreadedConnectionPool(
+            1,
+            maxconn or settings.DB_POOL_MAX,
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            dbname=settings.DB_NAME,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+        )
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commit on success, roll back on error."""
+        conn = self.pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def existing_ids(self, listing_ids):
+        """Subset of listing_ids already in bina_apartments (one query)."""
+        if not listing_ids:
+            return set()
+        with self.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT listing_id FROM bina_apartments WHERE listing_id = ANY(%s::bigint[]);",
+                ([int(i) for i in listing_ids],),
+            )
+            return {str(row[0]) for row in cur.fetchall()}
+
+    def insert_new(self, rows):
+        """
+        Insert card rows that aren't stored yet; existing rows are left
+        alone. Returns the listing_ids actually inserted (a concurrent
+        producer may have won the race for some of them).
+        """
+        if not rows:
+            return set()
+        sql = f"""
+        INSERT INTO bina_apartments ({", ".join(FAST_COLUMNS)})
+        VALUES %s
+        ON CONFLICT (listing_id) DO NOTHING
+        RETURNING listing_id;
+        """
+        template = "(" + ", ".join(f"%({c})s" for c in FAST_COLUMNS) + ")"
+        with self.connection() as conn:
+            cur = conn.cursor()
+            inserted = psycopg2.extras.execute_values(
+                cur, sql, rows, template=template, page_size=500, fetch=True
+            )
+            return {str(row[0]) for row in inserted}
+
+    def close(self):
+        self.pool.closeall()
+
+
 # ===========================================================
 # CHECK IF ALREADY SCRAPED
 # ===========================================================
@@ -63,26 +134,70 @@ def is_listing_scraped(listing_id):
 
 
 # ===========================================================
-# FAST SCRAPER UPSERT
+# BULK EXISTENCE CHECK
 # ===========================================================
-def upsert_listing_fast(**kw):
+def existing_listing_ids(listing_ids):
+    """Return the subset of listing_ids already in bina_apartments (one query)."""
+    if not listing_ids:
+        return set()
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT listing_id FROM bina_apartments WHERE listing_id = ANY(%s::bigint[]);",
+            ([int(i) for i in listing_ids],),
+        )
+        return {row[0] for row in cur.fetchall()}
+    finally:
+        if conn:
+            conn.close()
+
+
+def insert_discovered_listings(items):
+    """
+    Insert skeleton rows (listing_id, url) for listings found outside
+    the feed, so the detail scraper's UPDATE has a row to land on.
+    """
     sql = """
-    INSERT INTO bina_apartments (
-        listing_id, url, title,
-        price_azn, area_sqm, price_per_sqm,
-        rooms, floor_current, floor_total,
-        has_mortgage, has_deed,
-        location_area, location_city, owned_type,
-        posted_at, scraped_at
-    )
-    VALUES (
-        %(listing_id)s, %(url)s, %(title)s,
-        %(price_azn)s, %(area_sqm)s, %(price_per_sqm)s,
-        %(rooms)s, %(floor_current)s, %(floor_total)s,
-        %(has_mortgage)s, %(has_deed)s,
-        %(location_area)s, %(location_city)s, %(owned_type)s,
-        %(posted_at)s, %(scraped_at)s
-    )
+    INSERT INTO bina_apartments (listing_id, url, scraped_at)
+    VALUES %s
+    ON CONFLICT (listing_id) DO NOTHING;
+    """
+    now = now_utc()
+    rows = [(int(lid), url, now) for lid, url in items]
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        psycopg2.extras.execute_values(cur, sql, rows, page_size=1000)
+        conn.commit()
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print("[DB ERROR] DISCOVERED INSERT FAILED:", e)
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
+# ===========================================================
+# FAST SCRAPER UPSERT
+# ===========================================================
+FAST_COLUMNS = (
+    "listing_id", "url", "title",
+    "price_azn", "area_sqm", "price_per_sqm",
+    "rooms", "floor_current", "floor_total",
+    "has_mortgage", "has_deed",
+    "location_area", "location_city", "owned_type",
+    "posted_at", "scraped_at",
+    "content_hash",
+)
+
+FAST_CONFLICT = """
     ON CONFLICT (listing_id)
     DO UPDATE SET
         url = EXCLUDED.url,
@@ -99,7 +214,24 @@ def upsert_listing_fast(**kw):
         location_city = EXCLUDED.location_city,
         owned_type = EXCLUDED.owned_type,
         posted_at = EXCLUDED.posted_at,
-        scraped_at = EXCLUDED.scraped_at;
+        scraped_at = EXCLUDED.scraped_at,
+        content_hash = EXCLUDED.content_hash
+    -- Unchanged cards (same fingerprint) are not rewritten at all:
+    -- no dead tuple, no WAL, scraped_at keeps the last real change.
+    WHERE bina_apartments.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+    RETURNING listing_id, (xmax = 0) AS inserted
+"""
+
+
+def upsert_listing_fast(**kw):
+    """
+    Returns "inserted", "updated" or "unchanged" (fingerprint matched,
+    row left untouched).
+    """
+    sql = f"""
+    INSERT INTO bina_apartments ({", ".join(FAST_COLUMNS)})
+    VALUES ({", ".join(f"%({c})s" for c in FAST_COLUMNS)})
+    {FAST_CONFLICT};
     """
 
     conn = None
@@ -107,7 +239,11 @@ def upsert_listing_fast(**kw):
         conn = get_conn()
         cur = conn.cursor()
         cur.execute(sql, kw)
+        result = cur.fetchone()
         conn.commit()
+        if result is None:
+            return "unchanged"
+        return "inserted" if result[1] else "updated"
     except Exception as e:
         if conn:
             conn.rollback()
@@ -118,6 +254,42 @@ def upsert_listing_fast(**kw):
             conn.close()
 
 
+def upsert_listings_fast(rows, page_size=500):
+    """
+    Bulk variant of upsert_listing_fast: one statement per page_size rows.
+    Rows must be unique by listing_id (ON CONFLICT can't touch a row twice).
+
+    Returns {listing_id: "inserted" | "updated"}; unchanged rows are absent.
+    """
+    if not rows:
+        return {}
+
+    sql = f"""
+    INSERT INTO bina_apartments ({", ".join(FAST_COLUMNS)})
+    VALUES %s
+    {FAST_CONFLICT};
+    """
+    template = "(" + ", ".join(f"%({c})s" for c in FAST_COLUMNS) + ")"
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        written = psycopg2.extras.execute_values(
+            cur, sql, rows, template=template, page_size=page_size, fetch=True
+        )
+        conn.commit()
+        return {str(lid): ("inserted" if ins else "updated") for lid, ins in written}
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print("[DB ERROR] FAST BULK UPSERT FAILED:", e)
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
 # ===========================================================
 # DETAIL SCRAPER — **UPDATED: UPDATE ONLY, NEVER INSERT**
 # ===========================================================
@@ -168,3 +340,109 @@ def upsert_listing_detail(**kw):
     finally:
         if conn:
             conn.close()
+
+
+# ===========================================================
+# DETAIL REFRESH (SCHEDULED RE-VISIT OF A SCRAPED LISTING)
+# ===========================================================
+DETAIL_CONTENT_FIELDS = ("description", "posted_by", "contact_number", "is_constructed")
+
+
+def refresh_listing_detail(**kw):
+    """
+    Write a refresh visit. A None field means "not observed" and keeps
+    the stored value (refreshes don't click the phone reveal button,
+    and an extractor miss must not wipe a description).
+
+    Content changes bump detail_changes (the scheduler's change rate);
+    a visit where nothing at all changed only stamps refreshed_at.
+    Returns "changed", "views" (only view_count moved) or "unchanged".
+    """
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            SELECT {", ".join(DETAIL_CONTENT_FIELDS)}, view_count
+            FROM bina_apartments WHERE listing_id = %s FOR UPDATE;
+            """,
+            (kw["listing_id"],),
+        )
+        old = cur.fetchone()
+        if old is None:
+            conn.commit()
+            return "unchanged"
+
+        for i, field in enumerate(DETAIL_CONTENT_FIELDS):
+            if kw.get(field) is None:
+                kw[field] = old[i]
+
+        new_content = tuple(kw.get(f) for f in DETAIL_CONTENT_FIELDS)
+        content_changed = new_content != tuple(old[:4])
+        views_changed = kw.get("view_count") is not None and kw["view_count"] != old[4]
+
+        if content_changed or views_changed:
+            cur.execute(
+                """
+                UPDATE bina_apartments SET
+                    description = %(description)s,
+                    posted_by = %(posted_by)s,
+                    contact_number = %(contact_number)s,
+                    view_count = COALESCE(%(view_count)s, view_count),
+                    is_constructed = %(is_constructed)s,
+                    refreshed_at = %(refreshed_at)s,
+                    refresh_count = refresh_count + 1,
+                    detail_changes = detail_changes + %(changed)s
+                WHERE listing_id = %(listing_id)s;
+                """,
+                {**kw, "refreshed_at": now_utc(), "changed": int(content_changed)},
+            )
+        else:
+            cur.execute(
+                """
+                UPDATE bina_apartments
+                SET refreshed_at = %s, refresh_count = refresh_count + 1
+                WHERE listing_id = %s;
+                """,
+                (now_utc(), kw["listing_id"]),
+            )
+        conn.commit()
+
+        if content_changed:
+            return "changed"
+        return "views" if views_changed else "unchanged"
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print("[DB ERROR] DETAIL REFRESH FAILED:", e)
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
+def mark_refreshed(listing_id):
+    """Stamp a refresh visit that found the page unchanged (e.g. HTTP 304)."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            UPDATE bina_apartments
+            SET refreshed_at = %s, refresh_count = refresh_count + 1
+            WHERE listing_id = %s;
+            """,
+            (now_utc(), listing_id),
+        )
+        conn.commit()
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print("[DB ERROR] MARK REFRESHED FAILED:", e)
+        raise
+    finally:
+        if conn:
+            conn.close()
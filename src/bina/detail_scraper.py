@@ -8,36 +8,26 @@ from __future__ import annotations
 import time
 import re
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from bina.config import settings
-from bina.db import upsert_listing_detail, is_listing_scraped
+from bina.browser import get_driver
+from bina.db import (
+    upsert_listing_detail, refresh_listing_detail, mark_refreshed, is_listing_scraped,
+)
 from bina.rabbit import RabbitMQ
-
-
-def get_driver():
-    opts = Options()
-    opts.binary_location = "/usr/bin/chromium"
-    opts.add_argument("--headless=new")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--window-size=1920,1080")
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_argument("--lang=az-AZ")
-    service = Service("/usr/bin/chromedriver")
-    return webdriver.Chrome(service=service, options=opts)
+from bina.history import HistoryBuffer
+from bina import metrics, rate_limit
+from bina.run_ledger import RunLedger, page_transfer_bytes
 
 
 # ----------------------------------------------------------
 # FIELD EXTRACTORS - FIXED BASED ON ACTUAL HTML
 # ----------------------------------------------------------
 
+@metrics.timed("extract_description")
 def extract_description(driver):
     """
     Description container:
@@ -66,6 +56,7 @@ def extract_description(driver):
     return None
 
 
+@metrics.timed("extract_posted_by")
 def extract_posted_by(driver):
     """
     Owner name:
@@ -98,6 +89,7 @@ def extract_posted_by(driver):
     return None
 
 
+@metrics.timed("extract_phone")
 def extract_phone(driver):
     """
     Phone reveal button (OLD style):
@@ -179,6 +171,7 @@ def extract_phone(driver):
     return None
 
 
+@metrics.timed("extract_view_count")
 def extract_view_count(driver):
     """
     View count:
@@ -219,6 +212,7 @@ def extract_view_count(driver):
     return None
 
 
+@metrics.timed("extract_is_constructed")
 def extract_is_constructed(driver):
     """
     Repair/construction badge:
@@ -254,14 +248,72 @@ def extract_is_constructed(driver):
     return False
 
 
+def driver_alive(driver):
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception:
+        return False
+
+
 # ----------------------------------------------------------
 # MAIN LOOP
 # ----------------------------------------------------------
-def main(max_items=settings.DETAIL_SCRAPER_LIMIT, max_seconds=300):
+# Re-reads the document from Chrome's HTTP cache ("only-if-cached":
+# never hits the network) to get its raw body and validators.
+CACHED_DOCUMENT_JS = """
+var done = arguments[arguments.length - 1];
+fetch(location.href, {cache: "only-if-cached", mode: "same-origin"})
+    .then(function (r) {
+        if (!r.ok) { done(null); return; }
+        return r.text().then(function (body) {
+            done({etag: r.headers.get("ETag"),
+                  last_modified: r.headers.get("Last-Modified"),
+                  body: body});
+        });
+    })
+    .catch(function () { done(null); });
+"""
+
+
+def prime_cache(cache, driver, listing_id, url):
+    """Seed the page cache from the rendered visit; a miss just means no priming."""
+    try:
+        doc = driver.execute_async_script(CACHED_DOCUMENT_JS)
+        if doc:
+            cache.prime(listing_id, url, doc["body"].encode("utf-8"),
+                        doc.get("etag"), doc.get("last_modified"))
+    except Exception as e:
+        print(f"[DETAIL] Cache priming failed for {listing_id}: {e}")
+
+
+def archive_detail(archive, listing_id, driver):
+    from bina.html_archive import DETAIL
+
+    try:
+        archive.put(listing_id, DETAIL, driver.page_source)
+    except Exception as e:
+        print(f"[DETAIL] Archive failed for {listing_id}: {e}")
+
+
+def main(max_items=settings.DETAIL_SCRAPER_LIMIT, max_seconds=settings.DETAIL_RUN_SECONDS, rabbit=None):
     print("[DETAIL] START")
     
-    rabbit = RabbitMQ()
+    metrics.init("detail")
+    ledger = RunLedger("detail")
+    rabbit = rabbit or RabbitMQ()
     driver = get_driver()
+    history = HistoryBuffer("detail", batch_size=50)
+    # First visits prime the validators; refreshes use them to skip
+    # unchanged pages without rendering
+    cache = None
+    if settings.PAGE_CACHE_ENABLED:
+        from bina.page_cache import PageCache, HIT, MISS
+        cache = PageCache()
+    archive = None
+    if settings.ARCHIVE_ENABLED:
+        from bina.html_archive import HtmlArchive
+        archive = HtmlArchive()
 
     processed = 0
     errors = 0
@@ -269,6 +321,12 @@ def main(max_items=settings.DETAIL_SCRAPER_LIMIT, max_seconds=300):
 
     while True:
 
+        # The autoscaler sizes the fleet on this per-worker budget
+        if processed >= max_items or time.time() - start >= max_seconds:
+            print(f"[DETAIL] Run budget reached ({processed} items, "
+                  f"{time.time() - start:.0f}s) — stopping")
+            break
+
         msg = rabbit.consume_one(settings.RABBIT_QUEUE)
         if not msg:
             print("[DETAIL] Queue empty — stopping")
@@ -276,6 +334,7 @@ def main(max_items=settings.DETAIL_SCRAPER_LIMIT, max_seconds=300):
 
         listing_id = msg.get("listing_id")
         url = msg.get("url")
+        refresh = bool(msg.get("refresh"))
 
         if not listing_id or not url:
             print(f"[DETAIL] Invalid message: {msg}")
@@ -283,27 +342,62 @@ def main(max_items=settings.DETAIL_SCRAPER_LIMIT, max_seconds=300):
 
         print(f"\n[DETAIL] ===== Processing {listing_id} =====")
         print(f"[DETAIL] URL: {url}")
+        item_start = time.time()
 
         try:
-            # CHECK DATABASE FIRST
-            if is_listing_scraped(listing_id):
+            # CHECK DATABASE FIRST (refresh jobs re-visit on purpose)
+            if not refresh and is_listing_scraped(listing_id):
                 print(f"[DETAIL] ⏭️  SKIPPED — {listing_id} already scraped")
                 # Notify RabbitMQ that task is complete (skipped)
                 rabbit.publish_completion(
                     listing_id=listing_id,
                     status="skipped",
-                    message="Already scraped (is_scraped=True)"
+                    message="Already scraped (is_scraped=True)",
+                    duration_ms=(time.time() - item_start) * 1000,
                 )
+                metrics.inc(metrics.ITEMS_TOTAL, status="skipped")
+                ledger.skip()
+                processed += 1
+                continue
+
+            # Conditional GET only pays off for a re-visit; first visits
+            # prime the validators from the browser's load below instead
+            cached = None
+            if cache is not None and refresh:
+                rate_limit.acquire()
+                cached = cache.fetch(listing_id, url)
+            if cache is not None and cached == HIT:
+                mark_refreshed(listing_id)
+                print(f"[DETAIL] ⏭️  UNCHANGED — {listing_id} (conditional GET hit)")
+                rabbit.publish_completion(
+                    listing_id=listing_id,
+                    status="skipped",
+                    message="Refresh: page not modified",
+                    duration_ms=(time.time() - item_start) * 1000,
+                )
+                metrics.inc(metrics.ITEMS_TOTAL, status="unchanged")
+                ledger.skip()
                 processed += 1
                 continue
 
             # Proceed with scraping
-            driver.get(url)
-            time.sleep(3)  # Wait for page load
+            rate_limit.acquire()
+            with metrics.timer("page_load"):
+                driver.get(url)
+                time.sleep(3)  # Wait for page load
+            ledger.add_bytes(page_transfer_bytes(driver))
+            if cache is not None and cached != MISS:
+                prime_cache(cache, driver, listing_id, url)
+
+            # Archive before the phone click mutates the page
+            if archive is not None:
+                archive_detail(archive, listing_id, driver)
 
             description = extract_description(driver)
             posted_by = extract_posted_by(driver)
-            phone = extract_phone(driver)
+            # Refreshes keep the stored phone: the reveal click + wait is
+            # the slowest extractor and the number practically never changes
+            phone = None if refresh else extract_phone(driver)
             views = extract_view_count(driver)
             is_const = extract_is_constructed(driver)
 
@@ -315,28 +409,48 @@ def main(max_items=settings.DETAIL_SCRAPER_LIMIT, max_seconds=300):
             print(f"[DETAIL] views: {views or '✗'}")
             print(f"[DETAIL] is_constructed: {is_const}")
 
-            upsert_listing_detail(
-                listing_id=listing_id,
-                description=description,
-                posted_by=posted_by,
-                contact_number=phone,
-                view_count=views,
-                is_constructed=is_const,
-                is_scraped=True,
-            )
+            db_start = time.perf_counter()
+            if refresh:
+                outcome = refresh_listing_detail(
+                    listing_id=listing_id,
+                    description=description,
+                    posted_by=posted_by,
+                    contact_number=phone,
+                    view_count=views,
+                    is_constructed=is_const,
+                )
+                done_msg = f"Refreshed ({outcome})"
+            else:
+                upsert_listing_detail(
+                    listing_id=listing_id,
+                    description=description,
+                    posted_by=posted_by,
+                    contact_number=phone,
+                    view_count=views,
+                    is_constructed=is_const,
+                    is_scraped=True,
+                )
+                done_msg = "Successfully scraped and saved"
+            metrics.observe(metrics.STAGE_SECONDS, time.perf_counter() - db_start, stage="db_upsert")
+            metrics.inc(metrics.ITEMS_TOTAL, status="success")
+            history.add(listing_id, view_count=views)
 
             processed += 1
-            print(f"[DETAIL] ✓ SAVED {listing_id}")
+            ledger.item(time.time() - item_start)
+            print(f"[DETAIL] ✓ SAVED {listing_id} — {done_msg}")
             
             # Notify RabbitMQ that task completed successfully
             rabbit.publish_completion(
                 listing_id=listing_id,
                 status="success",
-                message="Successfully scraped and saved"
+                message=done_msg,
+                duration_ms=(time.time() - item_start) * 1000,
             )
 
         except Exception as e:
             errors += 1
+            ledger.error()
+            metrics.inc(metrics.ITEMS_TOTAL, status="error")
             print(f"[DETAIL] ✗ ERROR {listing_id}: {e}")
             import traceback
             traceback.print_exc()
@@ -345,13 +459,35 @@ def main(max_items=settings.DETAIL_SCRAPER_LIMIT, max_seconds=300):
             rabbit.publish_completion(
                 listing_id=listing_id,
                 status="error",
-                message=str(e)
+                message=str(e),
+                duration_ms=(time.time() - item_start) * 1000,
             )
 
+            # A crashed Chromium fails every later item: start a new one
+            if not driver_alive(driver):
+                print("[DETAIL] Browser is gone — restarting")
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                driver = get_driver()
+                ledger.restart()
+
+    history.flush()
+    if cache is not None:
+        cache.report()
+        cache.close()
+    if archive is not None:
+        archive.report()
+        archive.close()
     driver.quit()
     rabbit.close()
     print(f"\n[DETAIL] DONE — {processed} scraped, {errors} errors")
+    ledger.finish()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from bina.profiling import profiled
+
+    with profiled("detail"):
+        main()
\ No newline at end of file
@@ -7,6 +7,9 @@
 # -------------------------------------------------------
 #helper.py file
 from __future__ import annotations
+import hashlib
+import json
+import math
 import re
 from typing import Optional
 
@@ -54,3 +57,36 @@ def safe_float(s: str | None) -> Optional[float]:
         return float(s)
     except:
         return None
+
+
+# ===========================================================
+# PERCENTILE
+# ===========================================================
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile; None for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# ===========================================================
+# CARD FINGERPRINT
+# ===========================================================
+FINGERPRINT_FIELDS = (
+    "price_azn", "area_sqm", "rooms",
+    "floor_current", "floor_total",
+    "has_mortgage", "has_deed",
+    "location_area", "location_city", "owned_type",
+)
+
+
+def card_fingerprint(row: dict) -> str:
+    """
+    Stable hash of the card fields that matter downstream.
+    Timestamps and the URL are deliberately left out.
+    """
+    payload = json.dumps([row.get(f) for f in FINGERPRINT_FIELDS],
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/history.py
+# PRICE / VIEW HISTORY (APPEND-ONLY, MONTHLY PARTITIONS)
+# ------------------------------------------------------
+# bina_listing_history keeps every observed change of
+# price_azn and view_count. Writers buffer observations,
+# drop the ones equal to the latest stored value (one
+# DISTINCT ON lookup per batch) and COPY the rest in.
+# Each row carries the full (price, views) state, so the
+# newest row of a listing is always its current value.
+# Old months are detached, not deleted row by row.
+# ------------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import io
+from datetime import datetime, timedelta
+
+from bina.db import get_conn, now_utc
+
+
+HISTORY_TABLE = "bina_listing_history"
+HISTORY_COLUMNS = ("listing_id", "observed_at", "price_azn", "view_count", "source")
+
+
+# ===========================================================
+# PARTITIONS
+# ===========================================================
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(ts: datetime) -> datetime:
+    return month_start(month_start(ts) + timedelta(days=32))
+
+
+def partition_name(month: datetime) -> str:
+    return f"{HISTORY_TABLE}_y{month:%Y}m{month:%m}"
+
+
+def ensure_partitions(cur, timestamps):
+    """Create the monthly partitions the given timestamps fall into."""
+    for month in sorted({month_start(ts) for ts in timestamps}):
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+            f"PARTITION OF {HISTORY_TABLE} "
+            f"FOR VALUES FROM (%s) TO (%s);",
+            (month, next_month(month)),
+        )
+
+
+def list_partitions(cur):
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %s
+        ORDER BY c.relname;
+        """,
+        (HISTORY_TABLE,),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def detach_partitions_before(month: datetime, drop: bool = False):
+    """
+    Detach (and optionally drop) every monthly partition older than month.
+    Detaching is a catalog change, so it costs the same for any row count.
+    """
+    cutoff = partition_name(month_start(month))
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        for name in list_partitions(cur):
+            if name >= cutoff:
+                continue
+            cur.execute(f"ALTER TABLE {HISTORY_TABLE} DETACH PARTITION {name};")
+            if drop:
+                cur.execute(f"DROP TABLE {name};")
+            print(f"[HISTORY] {'Dropped' if drop else 'Detached'} {name}")
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print("[DB ERROR] HISTORY DETACH FAILED:", e)
+        raise
+    finally:
+        conn.close()
+
+
+# ===========================================================
+# QUERIES
+# ===========================================================
+LATEST_SQL = f"""
+SELECT DISTINCT ON (listing_id) listing_id, price_azn, view_count
+FROM {HISTORY_TABLE}
+WHERE listing_id = ANY(%s::bigint[])
+ORDER BY listing_id, observed_at DESC;
+"""
+
+# Listings whose newest price inside the window is below the last
+# price seen before it. Both sides are index probes on
+# (listing_id, observed_at DESC); the window side prunes partitions.
+PRICE_DELTAS_SQL = f"""
+SELECT cur.listing_id,
+       prev.price_azn AS old_price,
+       cur.price_azn AS new_price,
+       cur.price_azn - prev.price_azn AS delta,
+       cur.observed_at
+FROM (
+    SELECT DISTINCT ON (listing_id) listing_id, price_azn, observed_at
+    FROM {HISTORY_TABLE}
+    WHERE observed_at >= %(since)s AND price_azn IS NOT NULL
+    ORDER BY listing_id, observed_at DESC
+) cur
+JOIN LATERAL (
+    SELECT h.price_azn
+    FROM {HISTORY_TABLE} h
+    WHERE h.listing_id = cur.listing_id
+      AND h.observed_at < %(since)s
+      AND h.price_azn IS NOT NULL
+    ORDER BY h.observed_at DESC
+    LIMIT 1
+) prev ON TRUE
+WHERE cur.price_azn <> prev.price_azn
+ORDER BY delta
+LIMIT %(limit)s;
+"""
+
+
+def latest_values(cur, listing_ids):
+    """{listing_id: (price_azn, view_count)} for the newest stored row."""
+    if not listing_ids:
+        return {}
+    cur.execute(LATEST_SQL, ([int(i) for i in listing_ids],))
+    return {r[0]: (r[1], r[2]) for r in cur.fetchall()}
+
+
+def price_deltas(since: datetime, limit: int = 100):
+    """Price changes since `since`, biggest drops first."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(PRICE_DELTAS_SQL, {"since": since, "limit": limit})
+        return cur.fetchall()
+    finally:
+        conn.close()
+
+
+# ===========================================================
+# APPEND
+# ===========================================================
+def append_history(observations, source: str):
+    """
+    observations: iterable of dicts with listing_id and price_azn and/or
+    view_count (None = not observed). Only values that differ from the
+    latest stored state are written; the unobserved column is carried
+    forward. Returns the number of rows appended.
+    """
+    observations = list(observations)
+    if not observations:
+        return 0
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        latest = latest_values(cur, [o["listing_id"] for o in observations])
+
+        rows = []
+        for o in observations:
+            lid = int(o["listing_id"])
+            old_price, old_views = latest.get(lid, (None, None))
+            price = o.get("price_azn")
+            views = o.get("view_count")
+
+            price = old_price if price is None else price
+            views = old_views if views is None else views
+            if lid in latest and (price, views) == (old_price, old_views):
+                continue
+
+            ts = o.get("observed_at") or now_utc()
+            rows.append((lid, ts, price, views, source))
+            latest[lid] = (price, views)
+
+        if not rows:
+            return 0
+
+        ensure_partitions(cur, [r[1] for r in rows])
+
+        buf = io.StringIO()
+        for row in rows:
+            buf.write("\t".join("\\N" if v is None else str(v) for v in row))
+            buf.write("\n")
+        buf.seek(0)
+        cur.copy_expert(
+            f"COPY {HISTORY_TABLE} ({', '.join(HISTORY_COLUMNS)}) FROM STDIN",
+            buf,
+        )
+        conn.commit()
+        return len(rows)
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print("[DB ERROR] HISTORY APPEND FAILED:", e)
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
+class HistoryBuffer:
+    """Collects observations and appends them in batches."""
+
+    def __init__(self, source: str, batch_size: int = 200):
+        self.source = source
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+        self.dropped = 0
+
+    def add(self, listing_id, price_azn=None, view_count=None):
+        self.pending.append({
+            "listing_id": listing_id,
+            "price_azn": price_azn,
+            "view_count": view_count,
+            "observed_at": now_utc(),
+        })
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        try:
+            self.written += append_history(batch, self.source)
+        except Exception as e:
+            # History is best effort; the main write already succeeded
+            self.dropped += len(batch)
+            print(f"[DB ERROR] HISTORY BATCH DROPPED ({len(batch)} rows, "
+                  f"{self.dropped} this run, source={self.source}): {e}")
+
+
+# ----------------------------------------------------------
+# CLI
+# ----------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bina_listing_history maintenance and reports")
+    parser.add_argument("--price-changes", type=int, metavar="DAYS",
+                        help="List price changes over the last DAYS days")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--detach-before", metavar="YYYY-MM",
+                        help="Detach partitions older than this month")
+    parser.add_argument("--drop", action="store_true", help="Drop detached partitions")
+    args = parser.parse_args()
+
+    if args.price_changes:
+        since = now_utc() - timedelta(days=args.price_changes)
+        for lid, old, new, delta, ts in price_deltas(since, args.limit):
+            print(f"{lid}\t{old} → {new}\t({delta:+d})\t{ts:%Y-%m-%d %H:%M}")
+
+    if args.detach_before:
+        detach_partitions_before(datetime.strptime(args.detach_before, "%Y-%m"), args.drop)
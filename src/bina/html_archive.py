@@ -0,0 +1,155 @@
+# /opt/Etl_server_project_1/src/bina/html_archive.py
+# RAW HTML ARCHIVE (CONTENT-ADDRESSED)
+# ------------------------------------------------
+# When bina.az renames its styled-component classes the
+# parsers silently start returning None, and the only fix
+# used to be a full re-crawl. With BINA_HTML_ARCHIVE=1 the
+# scrapers keep every card / detail HTML they parse here,
+# so bina.reextract can re-run fixed parsers offline.
+#
+#   objects/<sha[:2]>/<sha>.html.gz|.html.zst  one file per distinct page
+#   index.sqlite                               (listing_id, kind, sha, fetched_at)
+#
+# Identical pages (unchanged cards re-seen every run) are
+# stored once. zstd needs the optional `zstandard` package;
+# the codec is per object, so mixed archives read fine.
+# ------------------------------------------------
+
+from __future__ import annotations
+import gzip
+import hashlib
+import os
+import sqlite3
+
+from bina.config import settings
+from bina.db import now_utc
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip works everywhere
+    zstandard = None
+
+
+CARD = "card"
+DETAIL = "detail"
+
+EXTENSIONS = {"gzip": ".html.gz", "zstd": ".html.zst"}
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd archive object but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def object_path(root, sha, codec):
+    return os.path.join(root, "objects", sha[:2], sha + EXTENSIONS[codec])
+
+
+def read_object(root, sha, codec) -> str:
+    """Module-level so pool workers can read without an HtmlArchive."""
+    with open(object_path(root, sha, codec), "rb") as f:
+        return decompress(f.read(), codec).decode("utf-8", errors="replace")
+
+
+class HtmlArchive:
+    def __init__(self, root=None, codec=None):
+        self.root = root or settings.ARCHIVE_DIR
+        self.codec = codec or settings.ARCHIVE_CODEC
+        if self.codec not in EXTENSIONS:
+            raise ValueError(f"Unknown archive codec: {self.codec}")
+        if self.codec == "zstd" and zstandard is None:
+            raise RuntimeError("BINA_ARCHIVE_CODEC=zstd needs the zstandard package")
+        self.stored = 0
+        self.deduped = 0
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL;")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                listing_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (listing_id, kind, sha256)
+            );
+            """
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS pages_latest ON pages (listing_id, kind, fetched_at);")
+        self.db.commit()
+
+    # ==========================================================
+    # WRITE
+    # ==========================================================
+    def put(self, listing_id, kind, html, fetched_at=None):
+        """Store one page; returns its sha256."""
+        data = html.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        fetched_at = (fetched_at or now_utc()).isoformat()
+
+        existing = self.db.execute(
+            "SELECT codec FROM pages WHERE sha256 = ? LIMIT 1;", (sha,)
+        ).fetchone()
+        codec = existing[0] if existing else self.codec
+
+        if existing and os.path.exists(object_path(self.root, sha, codec)):
+            self.deduped += 1
+        else:
+            path = object_path(self.root, sha, codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(compress(data, codec))
+            os.replace(tmp, path)
+            self.stored += 1
+
+        # Re-seeing the same page only moves its fetched_at forward
+        self.db.execute(
+            """
+            INSERT INTO pages (listing_id, kind, sha256, codec, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (listing_id, kind, sha256) DO UPDATE SET
+                fetched_at = MAX(fetched_at, excluded.fetched_at);
+            """,
+            (str(listing_id), kind, sha, codec, fetched_at),
+        )
+        # Commit right away: puts are seconds apart (browser work in
+        # between), and an open write transaction would hold the index
+        # lock against every other archiving process meanwhile
+        self.db.commit()
+        return sha
+
+    # ==========================================================
+    # READ
+    # ==========================================================
+    def latest(self, kind=None):
+        """(listing_id, kind, sha256, codec, fetched_at) of the newest page per listing."""
+        sql = """
+            SELECT listing_id, kind, sha256, codec, MAX(fetched_at)
+            FROM pages
+            {where}
+            GROUP BY listing_id, kind;
+        """
+        if kind:
+            return self.db.execute(sql.format(where="WHERE kind = ?"), (kind,))
+        return self.db.execute(sql.format(where=""))
+
+    def get(self, sha, codec):
+        return read_object(self.root, sha, codec)
+
+    def report(self):
+        print(f"[ARCHIVE] {self.stored} stored, {self.deduped} deduplicated ({self.codec})")
+
+    def close(self):
+        self.db.close()
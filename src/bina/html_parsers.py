@@ -0,0 +1,218 @@
+# /opt/Etl_server_project_1/src/bina/html_parsers.py
+# OFFLINE (LXML) PARSERS FOR ARCHIVED HTML
+# ------------------------------------------------
+# Same rules as the Selenium extractors in listing_producer
+# and detail_scraper, but over raw HTML strings, so archived
+# pages can be re-parsed without a browser (bina.reextract).
+# XPath instead of CSS selectors: no cssselect dependency.
+#
+# What a static document can't tell us is left out:
+#   - card badges (the Selenium check is "has a rendered size")
+#   - the phone number (only present after the reveal click)
+# ------------------------------------------------
+
+from __future__ import annotations
+import re
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+from bina.config import settings
+from bina.helper import safe_int, clean_text
+
+
+def has_class(fragment):
+    """XPath test equivalent to CSS [class*='fragment']."""
+    return f"contains(@class, '{fragment}')"
+
+
+def text_of(el):
+    return "".join(el.itertext()).strip()
+
+
+def parse_html(html):
+    return lxml_html.fromstring(html)
+
+
+# ===========================================================
+# CARDS
+# ===========================================================
+CARD_FIELDS = (
+    "price_azn", "area_sqm", "price_per_sqm", "rooms",
+    "floor_current", "floor_total",
+    "location_area", "location_city", "owned_type",
+)
+
+
+def card_price(card):
+    for el in card.xpath(f".//*[{has_class('price-container')}]//span[1]"):
+        price = safe_int(text_of(el))
+        if price is not None:
+            return price
+    for s in card.iter("span"):
+        txt = text_of(s)
+        if re.match(r"^\d[\d\s]{2,}$", txt):
+            return safe_int(txt)
+    return None
+
+
+def card_rooms_area_floor(card):
+    rooms, area, floor_c, floor_t = None, None, None, None
+    for s in card.iter("span"):
+        txt = text_of(s).lower()
+
+        if ("otaqlı" in txt or "otaq" in txt) and rooms is None:
+            m = re.search(r"(\d+)\s*otaq", txt)
+            if m:
+                rooms = int(m.group(1))
+
+        if "m²" in txt and area is None:
+            m = re.search(r"(\d+)\s*m²", txt)
+            if m:
+                area = int(m.group(1))
+
+        if "sot" in txt and area is None:
+            m = re.search(r"(\d+)\s*sot", txt)
+            if m:
+                area = int(m.group(1)) * 100
+
+        if "mərtəbə" in txt and floor_c is None:
+            m = re.search(r"(\d+)\s*/\s*(\d+)", txt)
+            if m:
+                floor_c, floor_t = int(m.group(1)), int(m.group(2))
+
+    return rooms, area, floor_c, floor_t
+
+
+def card_location(card):
+    loc_area = None
+    for el in card.xpath(f".//*[{has_class('sc-cb70b292-15')}]"):
+        loc_area = text_of(el)
+        break
+
+    if not loc_area:
+        for s in card.iter("span"):
+            txt = text_of(s)
+            if any(x in txt for x in ["otaqlı", "m²", "mərtəbə", "000"]):
+                continue
+            if re.search(r"\s+(m\.|r\.|q\.|k\.|küç\.|pr\.)$", txt) or "metro" in txt.lower():
+                loc_area = txt
+                break
+
+    loc_city = None
+    for el in card.xpath(".//*[@data-cy='city_when']"):
+        loc_city = text_of(el).split(",")[0].strip()
+        break
+
+    return clean_text(loc_area), clean_text(loc_city)
+
+
+def parse_card_html(html, base_url=None):
+    """
+    Card outerHTML → dict with listing_id, url and CARD_FIELDS.
+    Returns None when the card doesn't link to /items/<id>.
+    """
+    card = parse_html(html)
+    hrefs = card.xpath(".//a[@data-cy='item-card-link']/@href")
+    if not hrefs:
+        return None
+    url = urljoin(base_url or settings.BINA_BASE_URL, hrefs[0])
+    match = re.search(r"/items/(\d+)", url)
+    if not match:
+        return None
+
+    price = card_price(card)
+    rooms, area, floor_c, floor_t = card_rooms_area_floor(card)
+    loc_area, loc_city = card_location(card)
+    agency = card.xpath(".//*[@data-cy='product-label-agency']")
+
+    return dict(
+        listing_id=match.group(1),
+        url=url,
+        price_azn=price,
+        area_sqm=area,
+        price_per_sqm=(price / area if price and area else None),
+        rooms=rooms,
+        floor_current=floor_c,
+        floor_total=floor_t,
+        location_area=loc_area,
+        location_city=loc_city,
+        owned_type="agent" if agency else "owner",
+    )
+
+
+# ===========================================================
+# DETAIL PAGES
+# ===========================================================
+DETAIL_FIELDS = ("description", "posted_by", "view_count", "is_constructed")
+
+DESCRIPTION_XPATHS = (
+    "//*[@id='read-more']",
+    "//*[@data-cy='read-more']",
+    f"//*[{has_class('product-description__content')}]",
+    f"//*[{has_class('product-description')}]",
+)
+
+POSTED_BY_XPATHS = (
+    f"//*[{has_class('sc-4d25592c-2')}]",
+    f"//*[{has_class('GmovA')}]",
+    f"//*[{has_class('product-owner__info-name')}]",
+    f"//*[{has_class('product-owner')}]",
+    f"//*[{has_class('owner')}]//span",
+)
+
+VIEW_COUNT_XPATHS = (
+    f"//*[{has_class('product-statistics__i-text')}]",
+    f"//*[{has_class('product-statistics')}]//span",
+    f"//*[{has_class('statistics')}]//span",
+)
+
+REPAIR_KEYWORDS = ["təmirli", "tam təmir", "yeni təmir", "təmir olunub"]
+
+
+def detail_description(doc):
+    for xp in DESCRIPTION_XPATHS:
+        for el in doc.xpath(xp)[:1]:
+            txt = text_of(el)
+            if txt and len(txt) > 10:
+                return txt
+    return None
+
+
+def detail_posted_by(doc):
+    for xp in POSTED_BY_XPATHS:
+        for el in doc.xpath(xp)[:1]:
+            txt = text_of(el)
+            if txt and len(txt) < 50 and not txt.isdigit():
+                return txt
+    return None
+
+
+def detail_view_count(doc, html):
+    for xp in VIEW_COUNT_XPATHS:
+        for el in doc.xpath(xp):
+            txt = text_of(el)
+            if "Baxış" in txt or "baxış" in txt:
+                m = re.search(r"(\d+)", txt)
+                if m:
+                    return int(m.group(1))
+    m = re.search(r"Baxışların\s+sayı[:\s]+(\d+)", html, re.IGNORECASE)
+    return int(m.group(1)) if m else None
+
+
+def detail_is_constructed(doc, html):
+    if doc.xpath(f"//*[{has_class('icon--repair')}]"):
+        return True
+    lowered = html.lower()
+    return any(kw in lowered for kw in REPAIR_KEYWORDS)
+
+
+def parse_detail_html(html):
+    """Detail page source → dict with DETAIL_FIELDS."""
+    doc = parse_html(html)
+    return dict(
+        description=detail_description(doc),
+        posted_by=detail_posted_by(doc),
+        view_count=detail_view_count(doc, html),
+        is_constructed=detail_is_constructed(doc, html),
+    )
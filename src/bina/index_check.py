@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/index_check.py
+# EXPLAIN-BASED INDEX CHECK
+# ------------------------------------------------
+# Runs EXPLAIN on the pipeline's hot queries and checks
+# that the planner can answer each one with the index
+# bina.migrations created for it. Sequential scans are
+# disabled for the check, so small dev tables (where a
+# seq scan is legitimately cheaper) still prove the
+# index is usable. Exits non-zero on any miss.
+# ------------------------------------------------
+
+from __future__ import annotations
+import json
+import sys
+from datetime import timedelta
+
+from bina.db import get_conn, now_utc
+from bina.reconciler import ORPHAN_SCAN_SQL
+
+
+# (label, sql, params, expected index)
+CHECKS = [
+    (
+        "orphan keyset scan (reconciler)",
+        ORPHAN_SCAN_SQL,
+        {"after": 0, "cutoff": now_utc() - timedelta(hours=1), "batch": 200},
+        "bina_apartments_unscraped_idx",
+    ),
+    (
+        "changed-since count (aggregates)",
+        "SELECT COUNT(*) FROM bina_apartments WHERE scraped_at > %s;",
+        (now_utc() - timedelta(hours=1),),
+        "bina_apartments_scraped_at_brin",
+    ),
+    (
+        "bulk existence check",
+        "SELECT listing_id FROM bina_apartments WHERE listing_id = ANY(%s::bigint[]);",
+        ([5619908, 5272466],),
+        "bina_apartments_pkey",
+    ),
+    (
+        "area / rooms report",
+        """
+        SELECT AVG(price_per_sqm) FROM bina_apartments
+        WHERE location_area = %s AND rooms = %s;
+        """,
+        ("xətai m.", 2),
+        "bina_apartments_area_rooms_idx",
+    ),
+    (
+        "price band report",
+        "SELECT COUNT(*) FROM bina_apartments WHERE price_azn BETWEEN %s AND %s;",
+        (100000, 200000),
+        "bina_apartments_price_idx",
+    ),
+]
+
+
+def plan_indexes(node, found=None):
+    """Collect every index name referenced anywhere in a JSON plan."""
+    if found is None:
+        found = set()
+    if "Index Name" in node:
+        found.add(node["Index Name"])
+    for child in node.get("Plans", []):
+        plan_indexes(child, found)
+    return found
+
+
+def main() -> int:
+    conn = get_conn()
+    failures = 0
+    try:
+        cur = conn.cursor()
+        cur.execute("SET enable_seqscan = off;")
+
+        for label, sql, params, expected in CHECKS:
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            raw = cur.fetchone()[0]
+            plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+            used = plan_indexes(plan)
+
+            ok = expected in used
+            failures += 0 if ok else 1
+            print(f"[INDEX CHECK] {'✓' if ok else '✗'} {label}: "
+                  f"expected {expected}, plan uses {sorted(used) or 'no index'}")
+    finally:
+        conn.rollback()
+        conn.close()
+
+    print(f"[INDEX CHECK] DONE — {len(CHECKS) - failures}/{len(CHECKS)} queries use their index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
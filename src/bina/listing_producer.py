@@ -9,35 +9,26 @@ import time
 import re
 from datetime import datetime
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
 
 from bina.config import settings
+from bina.browser import get_driver
 from bina.db import upsert_listing_fast
 from bina.rabbit import RabbitMQ
-from bina.helper import safe_int, clean_text
-
-
-def get_driver():
-    opts = Options()
-    opts.binary_location = "/usr/bin/chromium"
-    opts.add_argument("--headless=new")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--window-size=1920,1080")
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_argument("--lang=az-AZ")
-    service = Service("/usr/bin/chromedriver")
-    return webdriver.Chrome(service=service, options=opts)
+from bina.history import HistoryBuffer
+from bina.html_archive import HtmlArchive, CARD
+from bina.helper import safe_int, clean_text, card_fingerprint
+from bina import metrics, rate_limit
+from bina.run_ledger import RunLedger, page_transfer_bytes
 
 
 # ----------------------------------------------------------
 # ROBUST PARSERS - Handle dynamic class names
 # ----------------------------------------------------------
 
+@metrics.timed("extract_price")
 def parse_price(card):
     """Price: <span class="...price-container"><span>280 000</span>"""
     try:
@@ -57,6 +48,7 @@ def parse_price(card):
     return None
 
 
+@metrics.timed("extract_rooms_area_floor")
 def parse_rooms_area_floor(card):
     """
     All three are in spans containing: "X otaqlı", "X m²", "X/X mərtəbə"
@@ -103,6 +95,7 @@ def parse_rooms_area_floor(card):
     return rooms, area, floor_c, floor_t
 
 
+@metrics.timed("extract_location")
 def parse_location(card):
     """
     Location area: span with class containing "sc-cb70b292-15" or text like "Xətai m."
@@ -146,6 +139,7 @@ def parse_location(card):
     return clean_text(loc_area), clean_text(loc_city)
 
 
+@metrics.timed("extract_badges")
 def parse_badges(card):
     """
     IMPORTANT: On the LISTING PAGE, badges are just empty styled spans.
@@ -185,6 +179,7 @@ def parse_badges(card):
     return has_mortgage, has_deed
 
 
+@metrics.timed("extract_owner")
 def detect_owner(card):
     """Agent badge: [data-cy='product-label-agency']"""
     try:
@@ -195,91 +190,327 @@ def detect_owner(card):
 
 
 # ----------------------------------------------------------
-# MAIN
+# CARD → ROW
 # ----------------------------------------------------------
-def main():
-    limit = settings.FAST_SCRAPER_LIMIT
-    rounds = settings.SCROLL_ROUNDS_LIMIT
-    sleep = settings.SCROLL_SLEEP
-
-    rabbit = RabbitMQ()
-    driver = get_driver()
+CARD_SELECTOR = "div[data-cy='item-card']"
 
-    print(f"[PRODUCER] START (limit={limit}, scroll_rounds={rounds})")
+# Cards already emitted by the streaming crawl are tagged and emptied,
+# so each round only sees (and the browser only holds) the new ones.
+PENDING_CARD_SELECTOR = "div[data-cy='item-card']:not([data-bina-done])"
 
-    driver.get(settings.BINA_BASE_URL)
-    time.sleep(3)
+RELEASE_CARDS_JS = """
+arguments[0].forEach(function (el) {
+    el.setAttribute('data-bina-done', '1');
+    el.innerHTML = '';
+});
+"""
 
-    # SCROLL to load more
-    last_height = 0
-    for i in range(rounds):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(sleep)
-        new_h = driver.execute_script("return document.body.scrollHeight;")
-        print(f"[PRODUCER] Scroll {i+1}/{rounds}, height={new_h}")
-        if new_h == last_height:
-            break
-        last_height = new_h
 
-    cards = driver.find_elements(By.CSS_SELECTOR, "div[data-cy='item-card']")
-    print(f"[PRODUCER] FOUND {len(cards)} CARDS")
+def extract_card(card):
+    """
+    Parse one item card into a bina_apartments row.
+    Returns None for cards that don't link to /items/<id>;
+    raises if the card link itself can't be read.
+    """
+    a = card.find_element(By.CSS_SELECTOR, "a[data-cy='item-card-link']")
+    url = a.get_attribute("href")
+    match = re.search(r"/items/(\d+)", url)
+    if not match:
+        return None
+    listing_id = match.group(1)
+
+    price = parse_price(card)
+    rooms, area, floor_c, floor_t = parse_rooms_area_floor(card)
+    loc_area, loc_city = parse_location(card)
+    has_mortgage, has_deed = parse_badges(card)
+    owner = detect_owner(card)
+
+    # Debug output
+    print(f"[PRODUCER] {listing_id}: price={price}, rooms={rooms}, area={area}, "
+          f"floor={floor_c}/{floor_t}, loc={loc_area}, city={loc_city}, "
+          f"mortgage={has_mortgage}, deed={has_deed}, owner={owner}")
+
+    row = dict(
+        listing_id=listing_id,
+        url=url,
+        title="Elan",
+        price_azn=price,
+        area_sqm=area,
+        price_per_sqm=(price / area if price and area else None),
+        rooms=rooms,
+        floor_current=floor_c,
+        floor_total=floor_t,
+        has_mortgage=has_mortgage,
+        has_deed=has_deed,
+        location_area=loc_area,
+        location_city=loc_city,
+        owned_type=owner,
+        posted_at=datetime.utcnow(),
+        scraped_at=datetime.utcnow(),
+    )
+    row["content_hash"] = card_fingerprint(row)
+    return row
+
+
+def emit_row(rabbit, row, stats=None, history=None):
+    """
+    Upsert the row and hand the listing to the detail scraper.
+    Cards whose fingerprint didn't change are neither rewritten nor
+    re-published (nor recorded in history).
+    """
+    with metrics.timer("db_upsert"):
+        status = upsert_listing_fast(**row)
+    metrics.inc(metrics.ITEMS_TOTAL, status=status)
+    if stats is not None:
+        stats.count(status)
+    if status != "unchanged":
+        rabbit.publish({"listing_id": row["listing_id"], "url": row["url"]})
+        if history is not None:
+            history.add(row["listing_id"], price_azn=row["price_azn"])
+
+
+class CrawlStats:
+    def __init__(self):
+        self.started = time.time()
+        self.processed = 0
+        self.errors = 0
+        self.first_publish = None
+        self.durations = []     # seconds per emitted card
+        self.writes = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    def count(self, status, n=1):
+        self.writes[status] += n
+
+    def report_writes(self):
+        total = sum(self.writes.values())
+        changed = self.writes["inserted"] + self.writes["updated"]
+        ratio = (changed / total * 100) if total else 0.0
+        print(f"[PRODUCER] Writes: {self.writes['inserted']} new, "
+              f"{self.writes['updated']} changed, {self.writes['unchanged']} unchanged "
+              f"({ratio:.0f}% changed)")
+
+    def published(self, seconds=None):
+        self.processed += 1
+        if seconds is not None:
+            self.durations.append(seconds)
+        if self.first_publish is None:
+            self.first_publish = time.time() - self.started
+            print(f"[PRODUCER] First publish after {self.first_publish:.1f}s")
+
+
+def archive_card(archive, card, row):
+    try:
+        archive.put(row["listing_id"], CARD, card.get_attribute("outerHTML"), row["scraped_at"])
+    except Exception as e:
+        print(f"[PRODUCER] Archive failed for {row['listing_id']}: {e}")
 
-    processed = 0
-    errors = 0
 
+def process_cards(cards, emit, stats, limit, seen=None, archive=None):
+    """Extract cards and pass each row to emit() until the limit is hit."""
     for idx, card in enumerate(cards):
-        if processed >= limit:
+        if stats.processed >= limit:
             break
 
+        t0 = time.perf_counter()
         try:
-            a = card.find_element(By.CSS_SELECTOR, "a[data-cy='item-card-link']")
-            url = a.get_attribute("href")
-            match = re.search(r"/items/(\d+)", url)
-            if not match:
-                continue
-            listing_id = match.group(1)
+            row = extract_card(card)
         except Exception as e:
             print(f"[PRODUCER] SKIP card {idx} — URL failed: {e}")
-            errors += 1
+            stats.errors += 1
+            metrics.inc(metrics.ITEMS_TOTAL, status="error")
+            continue
+
+        if row is None:
             continue
+        if seen is not None:
+            if row["listing_id"] in seen:
+                continue
+            seen.add(row["listing_id"])
+        if archive is not None:
+            archive_card(archive, card, row)
+
+        emit(row)
+        stats.published(time.perf_counter() - t0)
+
 
-        price = parse_price(card)
-        rooms, area, floor_c, floor_t = parse_rooms_area_floor(card)
-        loc_area, loc_city = parse_location(card)
-        has_mortgage, has_deed = parse_badges(card)
-        owner = detect_owner(card)
-
-        # Debug output
-        print(f"[PRODUCER] {listing_id}: price={price}, rooms={rooms}, area={area}, "
-              f"floor={floor_c}/{floor_t}, loc={loc_area}, city={loc_city}, "
-              f"mortgage={has_mortgage}, deed={has_deed}, owner={owner}")
-
-        upsert_listing_fast(
-            listing_id=listing_id,
-            url=url,
-            title="Elan",
-            price_azn=price,
-            area_sqm=area,
-            price_per_sqm=(price / area if price and area else None),
-            rooms=rooms,
-            floor_current=floor_c,
-            floor_total=floor_t,
-            has_mortgage=has_mortgage,
-            has_deed=has_deed,
-            location_area=loc_area,
-            location_city=loc_city,
-            owned_type=owner,
-            posted_at=datetime.utcnow(),
-            scraped_at=datetime.utcnow(),
+# ----------------------------------------------------------
+# EVENT-DRIVEN SCROLL
+# ----------------------------------------------------------
+# Scrolls to the bottom and resolves as soon as new item cards
+# stop arriving (no card mutation for settle_ms after the first
+# one), or with 0 when nothing arrives within timeout_ms.
+SCROLL_AND_WAIT_JS = """
+var timeoutMs = arguments[0], settleMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var sel = "div[data-cy='item-card']";
+var before = document.querySelectorAll(sel).length;
+var finished = false, settleTimer = null;
+
+function finish() {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(deadline);
+    clearTimeout(settleTimer);
+    done(document.querySelectorAll(sel).length - before);
+}
+
+var observer = new MutationObserver(function (mutations) {
+    for (var i = 0; i < mutations.length; i++) {
+        var nodes = mutations[i].addedNodes;
+        for (var j = 0; j < nodes.length; j++) {
+            var n = nodes[j];
+            if (n.nodeType === 1 && (n.matches(sel) || n.querySelector(sel))) {
+                clearTimeout(settleTimer);
+                settleTimer = setTimeout(finish, settleMs);
+                return;
+            }
+        }
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+var deadline = setTimeout(finish, timeoutMs);
+window.scrollTo(0, document.body.scrollHeight);
+"""
+
+
+class ScrollStats:
+    def __init__(self):
+        self.seconds = 0.0
+        self.cards = 0
+        self.rounds = 0
+
+    def report(self):
+        per_100 = (self.seconds / self.cards * 100) if self.cards else 0.0
+        print(f"[PRODUCER] Scroll: {self.rounds} rounds, {self.cards} cards loaded "
+              f"in {self.seconds:.1f}s ({per_100:.2f}s per 100 cards)")
+
+
+def scroll_round(driver, scroll_stats):
+    """One scroll; returns the number of cards the page appended."""
+    rate_limit.acquire()    # each scroll fetches the next feed page
+    t0 = time.time()
+    added = driver.execute_async_script(
+        SCROLL_AND_WAIT_JS,
+        int(settings.SCROLL_ROUND_TIMEOUT * 1000),
+        settings.SCROLL_SETTLE_MS,
+    )
+    scroll_stats.seconds += time.time() - t0
+    metrics.observe(metrics.STAGE_SECONDS, time.time() - t0, stage="scroll")
+    scroll_stats.cards += added
+    scroll_stats.rounds += 1
+    print(f"[PRODUCER] Scroll {scroll_stats.rounds}: +{added} cards "
+          f"({time.time() - t0:.2f}s)")
+    return added
+
+
+def wait_for_first_cards(driver):
+    """Replace the fixed post-load sleep: return as soon as a card renders."""
+    try:
+        WebDriverWait(driver, settings.SELENIUM_PAGE_LOAD_TIMEOUT).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, CARD_SELECTOR))
         )
+    except Exception:
+        print("[PRODUCER] No cards rendered before page-load timeout")
 
-        rabbit.publish({"listing_id": listing_id, "url": url})
-        processed += 1
 
+# ----------------------------------------------------------
+# CRAWL MODES
+# ----------------------------------------------------------
+def crawl_batch(driver, emit, stats, limit, rounds, archive=None):
+    """Scroll the whole feed first, then parse every card."""
+    scroll_stats = ScrollStats()
+    deadline = time.time() + settings.SCROLL_DEADLINE
+
+    for _ in range(rounds):
+        if time.time() > deadline:
+            print("[PRODUCER] Scroll deadline reached")
+            break
+        if scroll_round(driver, scroll_stats) == 0:
+            break
+
+    scroll_stats.report()
+
+    cards = driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)
+    print(f"[PRODUCER] FOUND {len(cards)} CARDS")
+
+    process_cards(cards, emit, stats, limit, archive=archive)
+
+
+def crawl_streaming(driver, emit, stats, limit, rounds, archive=None):
+    """
+    Emit cards as soon as each scroll round renders them.
+    Processed cards are emptied in the page and their WebElements
+    dropped, so browser memory stays flat with crawl depth.
+    """
+    seen = set()
+    scroll_stats = ScrollStats()
+    deadline = time.time() + settings.SCROLL_DEADLINE
+
+    for i in range(rounds + 1):
+        cards = driver.find_elements(By.CSS_SELECTOR, PENDING_CARD_SELECTOR)
+        print(f"[PRODUCER] Round {i}: {len(cards)} new cards")
+
+        process_cards(cards, emit, stats, limit, seen, archive)
+        driver.execute_script(RELEASE_CARDS_JS, cards)
+        del cards
+
+        if stats.processed >= limit or i == rounds:
+            break
+        if time.time() > deadline:
+            print("[PRODUCER] Scroll deadline reached")
+            break
+        if scroll_round(driver, scroll_stats) == 0:
+            break
+
+    scroll_stats.report()
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(rabbit=None):
+    """rabbit: queue client to publish to (default: a new RabbitMQ connection)."""
+    limit = settings.FAST_SCRAPER_LIMIT
+    rounds = settings.SCROLL_ROUNDS_LIMIT
+    streaming = settings.PRODUCER_STREAMING
+
+    metrics.init("producer")
+    ledger = RunLedger("producer")
+    rabbit = rabbit or RabbitMQ()
+    driver = get_driver()
+    driver.set_script_timeout(settings.SCROLL_ROUND_TIMEOUT + 5)
+    stats = CrawlStats()
+    history = HistoryBuffer("producer")
+    archive = HtmlArchive() if settings.ARCHIVE_ENABLED else None
+
+    print(f"[PRODUCER] START (limit={limit}, scroll_rounds={rounds}, streaming={streaming})")
+
+    rate_limit.acquire()
+    with metrics.timer("page_load"):
+        driver.get(settings.BINA_BASE_URL)
+        # Keep every scroll XHR in the resource timeline (bytes fetched)
+        driver.execute_script("performance.setResourceTimingBufferSize(100000);")
+        wait_for_first_cards(driver)
+
+    crawl = crawl_streaming if streaming else crawl_batch
+    crawl(driver, lambda row: emit_row(rabbit, row, stats, history), stats, limit, rounds, archive)
+    history.flush()
+    if archive is not None:
+        archive.report()
+        archive.close()
+
+    ledger.add_bytes(page_transfer_bytes(driver))
     driver.quit()
     rabbit.close()
-    print(f"[PRODUCER] DONE — {processed} scraped, {errors} errors")
+    stats.report_writes()
+    ledger.items, ledger.errors, ledger.durations = stats.processed, stats.errors, stats.durations
+    ledger.finish()
+    print(f"[PRODUCER] DONE — {stats.processed} scraped, {stats.errors} errors")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from bina.profiling import profiled
+
+    with profiled("producer"):
+        main()
@@ -0,0 +1,227 @@
+# /opt/Etl_server_project_1/src/bina/metrics.py
+# PER-STAGE METRICS (PROMETHEUS TEXT FORMAT)
+# ------------------------------------------------
+# Counters and latency histograms kept in-process and
+# snapshotted every few seconds (and at exit) to
+#   <BINA_METRICS_DIR>/<service>-<host>-<pid>.json
+# The scrapers are short-lived batch processes, so nothing
+# is scraped from them directly: health_check.py merges the
+# snapshot files and serves the sum at /metrics.
+#
+#   metrics.init("detail")
+#   with metrics.timer("page_load"):
+#       driver.get(url)
+#
+#   @metrics.timed("extract_phone")
+#   def extract_phone(driver): ...
+# ------------------------------------------------
+
+from __future__ import annotations
+import atexit
+import bisect
+import functools
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+
+from bina.config import settings
+
+
+STAGE_SECONDS = "bina_stage_seconds"
+ITEMS_TOTAL = "bina_items_total"
+
+HELP = {
+    STAGE_SECONDS: "Wall time spent per pipeline stage",
+    ITEMS_TOTAL: "Listings processed, by outcome",
+}
+
+# Upper bounds in seconds; +Inf is implicit
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_service = None
+_counters = {}      # (name, labels) → value
+_histograms = {}    # (name, labels) → [bucket counts..., +Inf count, sum]
+_last_flush = 0.0
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# ===========================================================
+# RECORDING
+# ===========================================================
+def init(service: str):
+    """Name this process's series and start writing snapshots."""
+    global _service
+    if _service is None:
+        atexit.register(flush)
+    _service = service
+
+
+def inc(name: str, value: float = 1, **labels):
+    key = _key(name, labels)
+    _counters[key] = _counters.get(key, 0) + value
+    _maybe_flush()
+
+
+def observe(name: str, seconds: float, **labels):
+    key = _key(name, labels)
+    hist = _histograms.get(key)
+    if hist is None:
+        hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+    hist[bisect.bisect_left(BUCKETS, seconds)] += 1
+    hist[-1] += seconds
+    _maybe_flush()
+
+
+@contextmanager
+def timer(stage: str, **labels):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(STAGE_SECONDS, time.perf_counter() - t0, stage=stage, **labels)
+
+
+def timed(stage: str):
+    """Decorator form of timer() for extractor functions."""
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def percentile(hist, q):
+    """
+    Estimate the q-th quantile (0..1) of a histogram by linear
+    interpolation inside the bucket it falls into.
+    """
+    total = sum(hist[:-1])
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    lower = 0.0
+    for upper, count in zip(BUCKETS + (None,), hist[:-1]):
+        if count and cumulative + count >= rank:
+            if upper is None:
+                return lower  # beyond the last bound
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = upper if upper is not None else lower
+    return lower
+
+
+# ===========================================================
+# SNAPSHOTS
+# ===========================================================
+def _maybe_flush():
+    if _service and time.time() - _last_flush >= settings.METRICS_FLUSH_SECONDS:
+        flush()
+
+
+def flush():
+    global _last_flush
+    if not _service:
+        return
+    _last_flush = time.time()
+
+    snapshot = {
+        "service": _service,
+        "counters": [[n, dict(l), v] for (n, l), v in _counters.items()],
+        "histograms": [[n, dict(l), h] for (n, l), h in _histograms.items()],
+    }
+    try:
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR,
+                            f"{_service}-{socket.gethostname()}-{os.getpid()}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"[METRICS] Snapshot failed: {e}")
+
+
+# ===========================================================
+# COLLECTION (health_check.py)
+# ===========================================================
+def collect(directory=None, retention_hours=None):
+    """
+    Merge every snapshot in the directory, summed per service.
+    Snapshots older than the retention window are deleted; the
+    merged counters drop accordingly, which Prometheus reads as
+    a counter reset.
+    """
+    directory = directory or settings.METRICS_DIR
+    retention = (retention_hours or settings.METRICS_RETENTION_HOURS) * 3600
+    counters, histograms = {}, {}
+
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return counters, histograms
+
+    for fname in names:
+        if not fname.endswith(".json"):
+            continue
+        path = os.path.join(directory, fname)
+        try:
+            if time.time() - os.path.getmtime(path) > retention:
+                os.remove(path)
+                continue
+            with open(path, encoding="utf-8") as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            continue  # being replaced or removed right now
+
+        service = snap["service"]
+        for name, labels, value in snap["counters"]:
+            key = _key(name, {**labels, "service": service})
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, hist in snap["histograms"]:
+            key = _key(name, {**labels, "service": service})
+            merged = histograms.setdefault(key, [0] * len(hist))
+            for i, v in enumerate(hist):
+                merged[i] += v
+
+    return counters, histograms
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def render(counters, histograms) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+    for name in sorted({n for n, _ in histograms}):
+        lines.append(f"# HELP {name} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {name} histogram")
+        for (n, labels), hist in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), hist[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {hist[-1]}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+    return "\n".join(lines) + "\n"
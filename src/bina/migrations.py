@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/migrations.py
+# VERSIONED SCHEMA MIGRATIONS
+# ------------------------------------------------
+# schema.sql creates the base tables once; everything
+# after that is a numbered migration here, recorded in
+# bina_schema_migrations and applied in order.
+# Index migrations use CREATE INDEX CONCURRENTLY so they
+# never block the scrapers (they run outside a transaction).
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+from dataclasses import dataclass
+
+from bina.db import get_conn
+
+
+# Arbitrary constant: serializes concurrent migration runners
+MIGRATION_LOCK_ID = 74_201_501
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+    # CONCURRENTLY statements can't run inside a transaction block
+    concurrent: bool = False
+
+
+MIGRATIONS = (
+    Migration(
+        1, "unscraped_partial_index",
+        (
+            # Requeue / reconcile scans: keyset on listing_id over the
+            # (small) unscraped subset only.
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS bina_apartments_unscraped_idx
+                ON bina_apartments (listing_id)
+                WHERE is_scraped = false;
+            """,
+        ),
+        concurrent=True,
+    ),
+    Migration(
+        2, "scraped_at_brin",
+        (
+            # Rows are written roughly in scraped_at order, so a BRIN
+            # index answers "changed since" scans at a tiny size.
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS bina_apartments_scraped_at_brin
+                ON bina_apartments USING brin (scraped_at);
+            """,
+        ),
+        concurrent=True,
+    ),
+    Migration(
+        3, "report_indexes",
+        (
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS bina_apartments_area_rooms_idx
+                ON bina_apartments (location_area, rooms);
+            """,
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS bina_apartments_price_idx
+                ON bina_apartments (price_azn)
+                WHERE price_azn IS NOT NULL;
+            """,
+        ),
+        concurrent=True,
+    ),
+    Migration(
+        4, "requeued_at",
+        (
+            # Set by bina.reconciler so an orphan isn't re-published
+            # again before the detail workers had a chance to take it.
+            "ALTER TABLE bina_apartments ADD COLUMN IF NOT EXISTS requeued_at TIMESTAMP;",
+        ),
+    ),
+    Migration(
+        5, "refresh_tracking",
+        (
+            # Written by refresh visits (db.refresh_listing_detail) and
+            # read by bina.refresh_scheduler to score staleness.
+            "ALTER TABLE bina_apartments ADD COLUMN IF NOT EXISTS refreshed_at TIMESTAMP;",
+            """
+            ALTER TABLE bina_apartments
+                ADD COLUMN IF NOT EXISTS refresh_count INTEGER NOT NULL DEFAULT 0;
+            """,
+            """
+            ALTER TABLE bina_apartments
+                ADD COLUMN IF NOT EXISTS detail_changes INTEGER NOT NULL DEFAULT 0;
+            """,
+        ),
+    ),
+    Migration(
+        6, "listing_status",
+        (
+            # Maintained by bina.removal_prober: 'active' | 'removed'
+            """
+            ALTER TABLE bina_apartments
+                ADD COLUMN IF NOT EXISTS listing_status TEXT NOT NULL DEFAULT 'active';
+            """,
+            "ALTER TABLE bina_apartments ADD COLUMN IF NOT EXISTS removed_at TIMESTAMP;",
+            "ALTER TABLE bina_apartments ADD COLUMN IF NOT EXISTS checked_at TIMESTAMP;",
+        ),
+    ),
+    Migration(
+        7, "scrape_runs",
+        (
+            # One row per producer / detail run (bina.run_ledger)
+            """
+            CREATE TABLE IF NOT EXISTS scrape_runs (
+                id BIGSERIAL PRIMARY KEY,
+                mode TEXT NOT NULL,
+                host TEXT,
+                started_at TIMESTAMP NOT NULL,
+                finished_at TIMESTAMP NOT NULL,
+                items INTEGER NOT NULL,
+                errors INTEGER NOT NULL,
+                bytes_fetched BIGINT NOT NULL DEFAULT 0,
+                browser_restarts INTEGER NOT NULL DEFAULT 0,
+                items_per_sec DOUBLE PRECISION NOT NULL,
+                p95_item_ms DOUBLE PRECISION
+            );
+            """,
+            "CREATE INDEX IF NOT EXISTS scrape_runs_mode_started_idx ON scrape_runs (mode, started_at);",
+        ),
+    ),
+    Migration(
+        8, "rate_limit_buckets",
+        (
+            # Shared token buckets (bina.rate_limit), one row per site
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                name TEXT PRIMARY KEY,
+                tokens DOUBLE PRECISION NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL
+            );
+            """,
+        ),
+    ),
+    Migration(
+        9, "updated_at",
+        (
+            # Change watermark for bina.parquet_export. scraped_at only
+            # moves on card changes; detail writes, refreshes and
+            # re-extraction must reach the export too, so a trigger
+            # stamps every UPDATE that changes an exported column.
+            "ALTER TABLE bina_apartments ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;",
+            "UPDATE bina_apartments SET updated_at = scraped_at WHERE updated_at IS NULL;",
+            """
+            ALTER TABLE bina_apartments
+                ALTER COLUMN updated_at SET DEFAULT (now() AT TIME ZONE 'utc');
+            """,
+            """
+            CREATE OR REPLACE FUNCTION bina_apartments_touch() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at := now() AT TIME ZONE 'utc';
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+            """,
+            "DROP TRIGGER IF EXISTS bina_apartments_touch ON bina_apartments;",
+            """
+            CREATE TRIGGER bina_apartments_touch
+                BEFORE UPDATE ON bina_apartments
+                FOR EACH ROW
+                WHEN ((OLD.url, OLD.title, OLD.price_azn, OLD.area_sqm, OLD.price_per_sqm,
+                       OLD.rooms, OLD.floor_current, OLD.floor_total, OLD.has_mortgage,
+                       OLD.has_deed, OLD.location_area, OLD.location_city, OLD.owned_type,
+                       OLD.posted_at, OLD.scraped_at, OLD.description, OLD.posted_by,
+                       OLD.contact_number, OLD.view_count, OLD.is_constructed, OLD.is_scraped)
+                      IS DISTINCT FROM
+                      (NEW.url, NEW.title, NEW.price_azn, NEW.area_sqm, NEW.price_per_sqm,
+                       NEW.rooms, NEW.floor_current, NEW.floor_total, NEW.has_mortgage,
+                       NEW.has_deed, NEW.location_area, NEW.location_city, NEW.owned_type,
+                       NEW.posted_at, NEW.scraped_at, NEW.description, NEW.posted_by,
+                       NEW.contact_number, NEW.view_count, NEW.is_constructed, NEW.is_scraped))
+                EXECUTE FUNCTION bina_apartments_touch();
+            """,
+        ),
+    ),
+    Migration(
+        10, "updated_at_index",
+        (
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS bina_apartments_updated_at_idx
+                ON bina_apartments (updated_at, listing_id);
+            """,
+        ),
+        concurrent=True,
+    ),
+    Migration(
+        11, "refresh_queued_at",
+        (
+            # Set by bina.refresh_scheduler on publish, so the same stale
+            # listings aren't pushed again while their job is queued.
+            "ALTER TABLE bina_apartments ADD COLUMN IF NOT EXISTS refresh_queued_at TIMESTAMP;",
+        ),
+    ),
+    Migration(
+        12, "scrape_runs_skips",
+        (
+            # Messages answered without a render (already scraped, 304);
+            # kept out of items / items_per_sec so throughput means pages
+            "ALTER TABLE scrape_runs ADD COLUMN IF NOT EXISTS skips INTEGER NOT NULL DEFAULT 0;",
+        ),
+    ),
+)
+
+
+# ===========================================================
+# RUNNER
+# ===========================================================
+def ensure_version_table(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bina_schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+        );
+        """
+    )
+
+
+def applied_versions(cur):
+    cur.execute("SELECT version FROM bina_schema_migrations;")
+    return {r[0] for r in cur.fetchall()}
+
+
+def drop_invalid_indexes(cur):
+    """A failed CONCURRENTLY build leaves an INVALID index behind; clear it."""
+    cur.execute(
+        """
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE NOT i.indisvalid AND t.relname = 'bina_apartments';
+        """
+    )
+    for (name,) in cur.fetchall():
+        print(f"[MIGRATE] Dropping invalid index {name}")
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+
+
+def apply(migration, conn):
+    cur = conn.cursor()
+    if migration.concurrent:
+        conn.autocommit = True
+        drop_invalid_indexes(cur)
+        for stmt in migration.statements:
+            cur.execute(stmt)
+        cur.execute(
+            "INSERT INTO bina_schema_migrations (version, name) VALUES (%s, %s);",
+            (migration.version, migration.name),
+        )
+        return
+
+    conn.autocommit = False
+    try:
+        for stmt in migration.statements:
+            cur.execute(stmt)
+        cur.execute(
+            "INSERT INTO bina_schema_migrations (version, name) VALUES (%s, %s);",
+            (migration.version, migration.name),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def migrate(dry_run=False):
+    conn = get_conn()
+    conn.autocommit = True
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+        ensure_version_table(cur)
+        done = applied_versions(cur)
+
+        pending = [m for m in MIGRATIONS if m.version not in done]
+        if not pending:
+            print("[MIGRATE] Schema is up to date")
+            return
+
+        for m in sorted(pending, key=lambda m: m.version):
+            if dry_run:
+                print(f"[MIGRATE] Pending {m.version:03d}_{m.name}")
+                continue
+            print(f"[MIGRATE] Applying {m.version:03d}_{m.name}...")
+            apply(m, conn)
+            print(f"[MIGRATE] ✓ {m.version:03d}_{m.name}")
+    finally:
+        try:
+            conn.autocommit = True
+            conn.cursor().execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending bina schema migrations")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations only")
+    args = parser.parse_args()
+    migrate(args.dry_run)
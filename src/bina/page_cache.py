@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/page_cache.py
+# CONDITIONAL-GET PAGE CACHE FOR DETAIL REFRESHES
+# ------------------------------------------------
+# Stores ETag / Last-Modified per listing plus a gzipped
+# copy of the page on disk (LRU-evicted to a byte budget).
+# Validators are primed from the browser's own first load
+# (no extra request). A refresh first asks the site
+# "changed since?"; a 304 (or a byte-identical body when
+# the site sends no validators) means the listing is
+# unchanged and the browser render + parsing is skipped.
+# Index lives in SQLite so concurrent workers can share it.
+# ------------------------------------------------
+
+from __future__ import annotations
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+
+import requests
+
+from bina.config import settings
+
+
+HIT = "hit"          # 304 Not Modified (or identical body)
+MISS = "miss"        # new or changed page, body stored
+ERROR = "error"      # fetch failed; caller falls back to the browser
+
+
+class PageCache:
+    def __init__(self, root=None, max_bytes=None, timeout=None):
+        self.root = root or settings.PAGE_CACHE_DIR
+        self.max_bytes = max_bytes or settings.PAGE_CACHE_MAX_MB * 1024 * 1024
+        self.timeout = timeout or settings.SELENIUM_PAGE_LOAD_TIMEOUT
+        os.makedirs(os.path.join(self.root, "bodies"), exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL;")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                listing_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body_sha1 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            """
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);")
+        self.db.commit()
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = settings.HTTP_USER_AGENT
+        self.stats = {HIT: 0, MISS: 0, ERROR: 0}
+
+    # ==========================================================
+    # STORAGE
+    # ==========================================================
+    def _body_path(self, listing_id):
+        return os.path.join(self.root, "bodies", f"{listing_id}.html.gz")
+
+    def _entry(self, listing_id):
+        return self.db.execute(
+            "SELECT etag, last_modified, body_sha1 FROM entries WHERE listing_id = ?;",
+            (str(listing_id),),
+        ).fetchone()
+
+    def _store(self, listing_id, url, content, etag, last_modified, sha1):
+        path = self._body_path(listing_id)
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+        self.db.execute(
+            """
+            INSERT INTO entries (listing_id, url, etag, last_modified, body_sha1, size, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (listing_id) DO UPDATE SET
+                url = excluded.url, etag = excluded.etag,
+                last_modified = excluded.last_modified, body_sha1 = excluded.body_sha1,
+                size = excluded.size, last_access = excluded.last_access;
+            """,
+            (str(listing_id), url, etag, last_modified,
+             sha1, os.path.getsize(path), time.time()),
+        )
+        self.db.commit()
+
+    def _touch(self, listing_id):
+        self.db.execute(
+            "UPDATE entries SET last_access = ? WHERE listing_id = ?;",
+            (time.time(), str(listing_id)),
+        )
+        self.db.commit()
+
+    def evict(self):
+        """Drop least-recently-used bodies until the cache fits its budget."""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries;").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        rows = self.db.execute("SELECT listing_id, size FROM entries ORDER BY last_access;")
+        for listing_id, size in rows.fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(listing_id))
+            except FileNotFoundError:
+                pass
+            self.db.execute("DELETE FROM entries WHERE listing_id = ?;", (listing_id,))
+            total -= size
+            evicted += 1
+        self.db.commit()
+        return evicted
+
+    def body(self, listing_id):
+        """Cached page HTML, or None."""
+        try:
+            with gzip.open(self._body_path(listing_id), "rb") as f:
+                return f.read().decode("utf-8", errors="replace")
+        except FileNotFoundError:
+            return None
+
+    # ==========================================================
+    # FETCH
+    # ==========================================================
+    def fetch(self, listing_id, url):
+        """Conditional GET. Returns HIT, MISS or ERROR."""
+        entry = self._entry(listing_id)
+        headers = {}
+        if entry:
+            etag, last_modified, _ = entry
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except Exception as e:
+            print(f"[CACHE] Fetch failed for {listing_id}: {e}")
+            self.stats[ERROR] += 1
+            return ERROR
+
+        if resp.status_code == 304 and entry:
+            self._touch(listing_id)
+            self.stats[HIT] += 1
+            return HIT
+
+        if resp.status_code != 200:
+            self.stats[ERROR] += 1
+            return ERROR
+
+        sha1 = hashlib.sha1(resp.content).hexdigest()
+        if entry and entry[2] == sha1:
+            # No validators from the site, but the bytes are identical
+            self._touch(listing_id)
+            self.stats[HIT] += 1
+            return HIT
+
+        self._store(listing_id, url, resp.content,
+                    resp.headers.get("ETag"), resp.headers.get("Last-Modified"), sha1)
+        self.evict()
+        self.stats[MISS] += 1
+        return MISS
+
+    def prime(self, listing_id, url, content: bytes, etag=None, last_modified=None):
+        """
+        Store validators seen by the browser's own load, so the first
+        refresh can already be conditional without a priming GET.
+        """
+        self._store(listing_id, url, content, etag, last_modified,
+                    hashlib.sha1(content).hexdigest())
+        self.evict()
+
+    def report(self):
+        total = sum(self.stats.values())
+        rate = (self.stats[HIT] / total * 100) if total else 0.0
+        print(f"[CACHE] {self.stats[HIT]} hits, {self.stats[MISS]} misses, "
+              f"{self.stats[ERROR]} errors ({rate:.0f}% hit rate)")
+
+    def close(self):
+        self.session.close()
+        self.db.close()
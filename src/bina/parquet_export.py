@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/parquet_export.py
+# INCREMENTAL PARQUET EXPORT
+# ------------------------------------------------
+# Exports bina_apartments rows changed since the last
+# updated_at watermark (stamped by a trigger on every write
+# path, migration 9) into date-partitioned,
+# compressed Parquet files, so analysts stop querying the
+# scrapers' Postgres. Rows stream through a server-side
+# cursor in fixed-size chunks: memory is bounded by the
+# chunk size, not the table size. The watermark is only
+# advanced after every chunk is on disk (at-least-once).
+# Each run re-reads BINA_EXPORT_LAG_SECONDS behind the
+# watermark to catch late commits, so a listing can appear
+# in several part files: readers keep the row with the
+# latest updated_at per listing_id.
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from bina.config import settings
+from bina.db import get_conn
+
+
+WATERMARK_FILE = "_watermark.json"
+
+# Explicit column types, so every part file has the same schema
+# regardless of which values happen to be NULL in a chunk.
+EXPORT_DTYPES = {
+    "listing_id": "int64",
+    "url": "string",
+    "title": "string",
+    "price_azn": "Int64",
+    "area_sqm": "Int64",
+    "price_per_sqm": "Float64",
+    "rooms": "Int64",
+    "floor_current": "Int64",
+    "floor_total": "Int64",
+    "has_mortgage": "boolean",
+    "has_deed": "boolean",
+    "location_area": "string",
+    "location_city": "string",
+    "owned_type": "string",
+    "posted_at": "datetime64[ns]",
+    "scraped_at": "datetime64[ns]",
+    "description": "string",
+    "posted_by": "string",
+    "contact_number": "string",
+    "view_count": "Int64",
+    "is_constructed": "boolean",
+    "is_scraped": "boolean",
+    "updated_at": "datetime64[ns]",
+}
+
+UPDATED_AT_POS = list(EXPORT_DTYPES).index("updated_at")
+
+EXPORT_SQL = f"""
+SELECT {", ".join(EXPORT_DTYPES)}
+FROM bina_apartments
+WHERE updated_at >= %(since)s
+ORDER BY updated_at, listing_id;
+"""
+
+
+# ===========================================================
+# WATERMARK
+# ===========================================================
+def read_watermark(out_dir):
+    """
+    (updated_at watermark, {(listing_id, updated_at iso)} already
+    exported inside the lag window, so re-reading it skips them).
+    """
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return datetime(1970, 1, 1), set()
+    with open(path, encoding="utf-8") as f:
+        wm = json.load(f)
+    # Watermarks written before migration 9 hold scraped_at, which is
+    # what updated_at was backfilled from
+    ts = wm.get("updated_at") or wm["scraped_at"]
+    return datetime.fromisoformat(ts), {tuple(r) for r in wm.get("recent", [])}
+
+
+def write_watermark(out_dir, ts, recent):
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"updated_at": ts.isoformat(), "recent": sorted(recent)}, f)
+    os.replace(tmp, path)
+
+
+# ===========================================================
+# EXPORT
+# ===========================================================
+def to_frame(rows):
+    df = pd.DataFrame.from_records(rows, columns=list(EXPORT_DTYPES))
+    return df.astype(EXPORT_DTYPES)
+
+
+def write_chunk(df, out_dir, run_id, chunk_no, compression):
+    """One part file per updated_at date present in the chunk."""
+    files = 0
+    for day, part in df.groupby(df["updated_at"].dt.strftime("%Y-%m-%d")):
+        part_dir = os.path.join(out_dir, f"dt={day}")
+        os.makedirs(part_dir, exist_ok=True)
+        part.to_parquet(
+            os.path.join(part_dir, f"part-{run_id}-{chunk_no:05d}.parquet"),
+            engine="pyarrow",
+            compression=compression,
+            index=False,
+        )
+        files += 1
+    return files
+
+
+def export(out_dir=settings.EXPORT_DIR, chunk_size=settings.EXPORT_CHUNK_SIZE,
+           compression=settings.EXPORT_COMPRESSION, lag_seconds=settings.EXPORT_LAG_SECONDS):
+    os.makedirs(out_dir, exist_ok=True)
+    wm_ts, exported = read_watermark(out_dir)
+    since = wm_ts - timedelta(seconds=lag_seconds) if wm_ts.year > 1970 else wm_ts
+    run_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+    print(f"[EXPORT] START — since {since.isoformat()} "
+          f"(watermark {wm_ts.isoformat()} - {lag_seconds}s), chunk={chunk_size}")
+
+    t0 = time.time()
+    rows_out = 0
+    files = 0
+    chunk_no = 0
+    last = None
+
+    conn = get_conn()
+    try:
+        # Named cursor = server-side: Postgres streams, we hold one chunk
+        cur = conn.cursor(name=f"bina_export_{run_id.replace('-', '_')}")
+        cur.itersize = chunk_size
+        cur.execute(EXPORT_SQL, {"since": since})
+
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            last = rows[-1][UPDATED_AT_POS]
+
+            # Lag-window rows the previous run already wrote
+            keys = [(r[0], r[UPDATED_AT_POS].isoformat()) for r in rows]
+            rows = [r for r, key in zip(rows, keys) if key not in exported]
+            # Rows arrive in updated_at order, so only keys inside the
+            # lag window behind the newest row can still matter
+            horizon = (last - timedelta(seconds=lag_seconds)).isoformat()
+            exported = {k for k in exported if k[1] >= horizon}
+            exported.update(k for k in keys if k[1] >= horizon)
+            if not rows:
+                continue
+
+            df = to_frame(rows)
+            files += write_chunk(df, out_dir, run_id, chunk_no, compression)
+            rows_out += len(rows)
+            chunk_no += 1
+            del df, rows
+
+        cur.close()
+    finally:
+        conn.close()
+
+    if last:
+        write_watermark(out_dir, last, exported)
+
+    print(f"[EXPORT] DONE — {rows_out} rows, {files} files in {time.time() - t0:.1f}s"
+          f"{f'; watermark → {last.isoformat()}' if last else ''}")
+    return rows_out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental Parquet export of bina_apartments")
+    parser.add_argument("--out", default=settings.EXPORT_DIR, help="Output directory")
+    parser.add_argument("--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE)
+    parser.add_argument("--compression", default=settings.EXPORT_COMPRESSION)
+    parser.add_argument("--lag-seconds", type=int, default=settings.EXPORT_LAG_SECONDS,
+                        help="Re-read this far behind the watermark")
+    args = parser.parse_args()
+    export(args.out, args.chunk_size, args.compression, args.lag_seconds)
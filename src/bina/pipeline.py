@@ -0,0 +1,95 @@
+# /opt/Etl_server_project_1/src/bina/pipeline.py
+# CARDS-ONLY PIPELINE (src/main.py)
+# ------------------------------------------------
+# Scrolls the feed one round at a time and, per round,
+# asks the DB in one query which listing ids it already
+# has. Only unknown cards are inserted and returned.
+# The feed is newest-first, so the first round with
+# nothing new means we have caught up: incremental runs
+# stop there and cost what the new listings cost, not
+# what the feed depth costs.
+# ------------------------------------------------
+
+from __future__ import annotations
+import time
+
+from selenium.webdriver.common.by import By
+
+from bina.config import settings
+from bina.history import HistoryBuffer
+from bina.listing_producer import (
+    CARD_SELECTOR, PENDING_CARD_SELECTOR, RELEASE_CARDS_JS,
+    ScrollStats, extract_card, scroll_round, wait_for_first_cards,
+)
+
+
+class Pipeline:
+    def __init__(self, db, browser):
+        self.db = db
+        self.browser = browser
+
+    def verify(self) -> bool:
+        """True when the loaded page renders listing cards."""
+        wait_for_first_cards(self.browser.driver)
+        cards = self.browser.driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)
+        print(f"[verify] {len(cards)} cards on {self.browser.driver.current_url}")
+        return len(cards) > 0
+
+    def read_round(self, driver, seen):
+        """Rows for the cards this round rendered (deduplicated across rounds)."""
+        cards = driver.find_elements(By.CSS_SELECTOR, PENDING_CARD_SELECTOR)
+        rows = []
+        for card in cards:
+            try:
+                row = extract_card(card)
+            except Exception as e:
+                print(f"[pipeline] SKIP card — {e}")
+                continue
+            if row is None or row["listing_id"] in seen:
+                continue
+            seen.add(row["listing_id"])
+            rows.append(row)
+        driver.execute_script(RELEASE_CARDS_JS, cards)
+        return rows
+
+    def run(self, max_new: int) -> list[dict]:
+        """
+        Insert up to max_new listings not yet in bina_apartments.
+        Returns [{"id", "url"}] for the rows this run inserted.
+        """
+        driver = self.browser.driver
+        wait_for_first_cards(driver)
+
+        seen = set()
+        new = []
+        history = HistoryBuffer("pipeline")
+        scroll_stats = ScrollStats()
+        deadline = time.time() + settings.SCROLL_DEADLINE
+
+        for i in range(settings.SCROLL_ROUNDS_LIMIT + 1):
+            rows = self.read_round(driver, seen)
+            known = self.db.existing_ids([r["listing_id"] for r in rows])
+            fresh = [r for r in rows if r["listing_id"] not in known][:max_new - len(new)]
+
+            inserted = self.db.insert_new(fresh)
+            for row in fresh:
+                if row["listing_id"] in inserted:
+                    new.append({"id": row["listing_id"], "url": row["url"]})
+                    history.add(row["listing_id"], price_azn=row["price_azn"])
+
+            print(f"[pipeline] Round {i}: {len(rows)} cards, {len(known)} known, "
+                  f"{len(inserted)} inserted ({len(new)}/{max_new})")
+
+            if len(new) >= max_new:
+                break
+            if rows and not fresh:
+                print("[pipeline] Reached known listings — stopping")
+                break
+            if i == settings.SCROLL_ROUNDS_LIMIT or time.time() > deadline:
+                break
+            if scroll_round(driver, scroll_stats) == 0:
+                break
+
+        history.flush()
+        scroll_stats.report()
+        return new
@@ -0,0 +1,190 @@
+# /opt/Etl_server_project_1/src/bina/profiling.py
+# ON-DEMAND RUN PROFILER
+# ------------------------------------------------
+# Off unless asked for, so normal runs pay nothing:
+#   BINA_PROFILE=sample    wall-clock stack sampler (low overhead)
+#   BINA_PROFILE=cprofile  sampler + cProfile (exact call counts)
+#   python src/main.py --incremental --profile sample
+#
+# Every profiled run also wraps selenium's
+# RemoteConnection.execute to measure how much wall time is
+# spent waiting on chromedriver, next to process CPU time.
+# At exit, into BINA_PROFILE_DIR:
+#   <name>-<ts>-<pid>.collapsed   flamegraph.pl / speedscope input
+#   <name>-<ts>-<pid>.prof        pstats dump (cprofile mode)
+#   <name>-<ts>-<pid>.txt         wall / CPU / WebDriver summary
+# ------------------------------------------------
+
+from __future__ import annotations
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from bina.config import settings
+
+
+MODES = ("sample", "cprofile")
+
+
+# ===========================================================
+# WEBDRIVER WAIT TRACKING
+# ===========================================================
+class WebDriverTimer:
+    """Accumulates wall time per WebDriver command while installed."""
+
+    def __init__(self):
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.original = None
+
+    def install(self):
+        try:
+            from selenium.webdriver.remote.remote_connection import RemoteConnection
+        except ImportError:
+            return
+        self.original = original = RemoteConnection.execute
+        timer = self
+
+        def execute(conn, command, params):
+            t0 = time.perf_counter()
+            try:
+                return original(conn, command, params)
+            finally:
+                timer.seconds[command] += time.perf_counter() - t0
+                timer.calls[command] += 1
+
+        RemoteConnection.execute = execute
+
+    def uninstall(self):
+        if self.original is not None:
+            from selenium.webdriver.remote.remote_connection import RemoteConnection
+            RemoteConnection.execute = self.original
+            self.original = None
+
+    @property
+    def total(self):
+        return sum(self.seconds.values())
+
+
+# ===========================================================
+# STACK SAMPLER
+# ===========================================================
+def frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's stack every `interval` seconds (wall clock)."""
+
+    def __init__(self, target_thread_id, interval):
+        super().__init__(daemon=True, name="bina-profiler")
+        self.target = target_thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.halt = threading.Event()
+
+    def run(self):
+        while not self.halt.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self.halt.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+# ===========================================================
+# RUN WRAPPER
+# ===========================================================
+def summary(name, mode, wall, cpu, webdriver, sampler, profiler):
+    lines = [
+        f"[PROFILE] {name} ({mode}) — wall {wall:.1f}s, CPU {cpu:.1f}s "
+        f"({cpu / wall * 100 if wall else 0:.0f}%), "
+        f"WebDriver wait {webdriver.total:.1f}s ({webdriver.total / wall * 100 if wall else 0:.0f}%), "
+        f"other {max(0.0, wall - cpu - webdriver.total):.1f}s",
+    ]
+    for command, secs in webdriver.seconds.most_common(8):
+        lines.append(f"[PROFILE]   webdriver {command:28s} {webdriver.calls[command]:>6} calls "
+                     f"{secs:>8.2f}s")
+
+    # Leaf frames of the sampled stacks = where the time actually went
+    leaves = Counter()
+    for stack, count in sampler.stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    for leaf, count in leaves.most_common(10):
+        lines.append(f"[PROFILE]   sampled   {leaf:50s} {count / max(sampler.samples, 1) * 100:5.1f}%")
+
+    if profiler is not None:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+        lines.append(out.getvalue())
+    return "\n".join(lines)
+
+
+@contextmanager
+def profiled(name: str, mode: str | None = None):
+    """
+    Profile the enclosed block when mode (or BINA_PROFILE) is set.
+    "1" / "true" mean "sample".
+    """
+    mode = (mode or settings.PROFILE or "").lower()
+    if mode in ("1", "true", "yes"):
+        mode = "sample"
+    if mode not in MODES:
+        yield
+        return
+
+    webdriver = WebDriverTimer()
+    webdriver.install()
+    sampler = StackSampler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000)
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+
+    print(f"[PROFILE] {name}: {mode} profiling on "
+          f"(every {settings.PROFILE_INTERVAL_MS} ms → {settings.PROFILE_DIR})")
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        sampler.stop()
+        webdriver.uninstall()
+        wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+
+        base = os.path.join(
+            settings.PROFILE_DIR, f"{name}-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        )
+        text = summary(name, mode, wall, cpu, webdriver, sampler, profiler)
+        print(text)
+        try:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                f.write(sampler.collapsed())
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            if profiler is not None:
+                profiler.dump_stats(base + ".prof")
+            print(f"[PROFILE] Written {base}.*")
+        except OSError as e:
+            print(f"[PROFILE] Could not write profile: {e}")
@@ -22,6 +22,7 @@ from pika.exceptions import (
 )
 
 from bina.config import settings
+from bina import metrics
 
 # Completion queue name (can be configured)
 COMPLETION_QUEUE = "detail_scraper_completed"
@@ -40,6 +41,10 @@ class RabbitMQ:
         if self.host in ["127.0.0.1", "localhost"]:
             self.host = "rabbitmq"
 
+        # Bumped on every (re)connect: delivery tags are per channel,
+        # so a tag from an older generation can't be acked any more
+        self.generation = 0
+        self.batch_generation = None
         self._connect()
 
     # ==========================================================
@@ -68,6 +73,7 @@ class RabbitMQ:
 
                 self.connection = BlockingConnection(params)
                 self.channel = self.connection.channel()
+                self.generation += 1
 
                 # Strong delivery safety
                 self.channel.confirm_delivery()
@@ -81,6 +87,15 @@ class RabbitMQ:
                 # Prefetch for load control
                 self.channel.basic_qos(prefetch_count=1)
 
+                # Completion events go through their own channel:
+                # no publisher confirms, so publishing never waits on
+                # the broker, and the queue is declared once here.
+                self.completion_channel = self.connection.channel()
+                self.completion_channel.queue_declare(
+                    queue=COMPLETION_QUEUE,
+                    durable=True
+                )
+
                 print("[RABBIT] CONNECTED ✔")
                 return
 
@@ -108,16 +123,17 @@ class RabbitMQ:
         body = json.dumps(msg, ensure_ascii=False)
 
         try:
-            self._safe(
-                self.channel.basic_publish,
-                exchange="",
-                routing_key=settings.RABBIT_QUEUE,
-                body=body,
-                mandatory=True,
-                properties=pika.BasicProperties(
-                    delivery_mode=2  # persistent
+            with metrics.timer("publish"):
+                self._safe(
+                    self.channel.basic_publish,
+                    exchange="",
+                    routing_key=settings.RABBIT_QUEUE,
+                    body=body,
+                    mandatory=True,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2  # persistent
+                    )
                 )
-            )
         except Exception as e:
             print(f"[RABBIT PUBLISH ERROR] {e}")
             raise
@@ -125,47 +141,116 @@ class RabbitMQ:
     # ==========================================================
     # PUBLISH COMPLETION STATUS
     # ==========================================================
-    def publish_completion(self, listing_id: str, status: str, message: str = ""):
+    def publish_completion(self, listing_id: str, status: str, message: str = "",
+                           duration_ms: float | None = None):
         """
         Publish completion status to a dedicated completion queue.
-        
+
+        Uses the unconfirmed completion channel with transient delivery,
+        so a lost event costs one sample in scrape_stats, never a stall.
+
         Args:
             listing_id: The listing that was processed
             status: 'success', 'skipped', or 'error'
             message: Optional message with details
+            duration_ms: Wall time spent on the listing (for p50/p95 stats)
         """
         completion_msg = {
             "listing_id": listing_id,
             "status": status,
             "message": message,
+            "duration_ms": duration_ms,
             "timestamp": time.time()
         }
-        
+
         body = json.dumps(completion_msg, ensure_ascii=False)
-        
+
         try:
-            # Ensure completion queue exists
             self._safe(
-                self.channel.queue_declare,
-                queue=COMPLETION_QUEUE,
-                durable=True
-            )
-            
-            self._safe(
-                self.channel.basic_publish,
-                exchange="",
-                routing_key=COMPLETION_QUEUE,
-                body=body,
-                mandatory=False,
-                properties=pika.BasicProperties(
-                    delivery_mode=2  # persistent
+                lambda: self.completion_channel.basic_publish(
+                    exchange="",
+                    routing_key=COMPLETION_QUEUE,
+                    body=body,
+                    mandatory=False,
+                    properties=pika.BasicProperties(
+                        delivery_mode=1  # transient
+                    )
                 )
             )
-            print(f"[RABBIT] Published completion: {listing_id} → {status}")
         except Exception as e:
             print(f"[RABBIT COMPLETION ERROR] {e}")
             # Don't raise - completion notification is optional
 
+    # ==========================================================
+    # DRAIN A BATCH (MANUAL ACK)
+    # ==========================================================
+    def get_batch(self, queue_name: str, max_messages: int):
+        """
+        Pull up to max_messages without acking them.
+
+        Returns (messages, last_delivery_tag). The caller acks the whole
+        batch with ack_through(last_delivery_tag) once it is persisted;
+        if the caller dies first, the broker redelivers everything.
+        A reconnect mid-batch drops what was pulled on the old channel:
+        the broker redelivers those messages, and their tags can't be
+        acked on the new channel.
+        """
+        messages = []
+        last_tag = None
+        self.batch_generation = self.generation
+
+        for _ in range(max_messages):
+            method, _, body = self._safe(
+                lambda: self.channel.basic_get(queue_name, auto_ack=False)
+            )
+            if self.generation != self.batch_generation:
+                print(f"[RABBIT] Reconnected mid-batch — dropping {len(messages)} "
+                      f"messages (the broker redelivers them)")
+                messages = []
+                self.batch_generation = self.generation
+            if not method:
+                break
+
+            last_tag = method.delivery_tag
+            try:
+                messages.append(json.loads(body))
+            except Exception:
+                print("[RABBIT WARNING] Invalid JSON in batch — dropping.")
+
+        return messages, last_tag
+
+    def ack_through(self, delivery_tag):
+        """
+        Ack every unacked message up to and including delivery_tag.
+        Returns False when the tag belongs to a channel that has since
+        been replaced (its messages are redelivered instead).
+        """
+        if delivery_tag is None:
+            return True
+        if self.generation != self.batch_generation:
+            print("[RABBIT WARNING] Channel replaced since the batch was read — not acking")
+            return False
+        try:
+            self.channel.basic_ack(delivery_tag, multiple=True)
+        except (AMQPConnectionError, StreamLostError, ChannelClosedByBroker) as e:
+            # The next basic_get reconnects; the unacked batch comes back
+            print(f"[RABBIT WARNING] Ack failed, batch will be redelivered: {e}")
+            return False
+        return True
+
+    # ==========================================================
+    # QUEUE DEPTH
+    # ==========================================================
+    def queue_depth(self, queue_name=None) -> int:
+        """Ready messages in the queue (passive declare, no side effects)."""
+        if queue_name is None:
+            queue_name = settings.RABBIT_QUEUE
+
+        result = self._safe(
+            lambda: self.channel.queue_declare(queue=queue_name, durable=True, passive=True)
+        )
+        return result.method.message_count
+
     # ==========================================================
     # CONSUME EXACTLY ONE MESSAGE
     # ==========================================================
@@ -174,10 +259,11 @@ class RabbitMQ:
             queue_name = settings.RABBIT_QUEUE
 
         try:
-            method, _, body = self._safe(
-                self.channel.basic_get,
-                queue_name
-            )
+            with metrics.timer("consume"):
+                method, _, body = self._safe(
+                    self.channel.basic_get,
+                    queue_name
+                )
         except Exception as e:
             print(f"[RABBIT CONSUME ERROR] {e}")
             return None
@@ -193,7 +279,8 @@ class RabbitMQ:
             self.channel.basic_ack(method.delivery_tag)
             return None
 
-        self.channel.basic_ack(method.delivery_tag)
+        with metrics.timer("ack"):
+            self.channel.basic_ack(method.delivery_tag)
         return msg
 
     # ==========================================================
@@ -0,0 +1,184 @@
+# /opt/Etl_server_project_1/src/bina/rate_limit.py
+# SHARED REQUEST BUDGET FOR ALL SCRAPER PROCESSES
+# ------------------------------------------------
+# One token bucket per site, shared by every producer,
+# detail worker and planner shard:
+#   rate_limit.acquire()           # before each page fetch
+#   await rate_limit.acquire_async()   # same, in asyncio code
+# blocks until the fetch fits in BINA_RATE_LIMIT_RPS
+# (bursts up to BINA_RATE_LIMIT_BURST).
+#
+# postgres  the bucket is a rate_limit_buckets row, refilled
+#           and debited in one upsert (the row lock serializes
+#           callers across hosts, the DB clock is the clock).
+#           A caller that finds it empty takes a reservation
+#           (tokens go negative) and sleeps until it's due, so
+#           waiters are served in order and the budget is
+#           used fully without ever being exceeded.
+# file      same bucket in a JSON file under fcntl.flock —
+#           one host only.
+# off       no limiting.
+#
+# When Postgres is unreachable the host drops to a file bucket
+# with no burst (one fetch per 1/rate s for the whole host) and
+# says so on every failed reconnect, retried every
+# PG_RETRY_SECONDS. Other hosts can't see that bucket, so this
+# keeps the overshoot as small as possible instead of quietly
+# granting each host the full budget.
+# ------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import fcntl
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+from bina.config import settings
+from bina import metrics
+
+
+BACKENDS = ("postgres", "file", "off")
+PG_RETRY_SECONDS = 30
+
+REFILL_SQL = """
+INSERT INTO rate_limit_buckets AS b (name, tokens, updated_at)
+VALUES (%(name)s, %(burst)s - %(n)s, clock_timestamp())
+ON CONFLICT (name) DO UPDATE SET
+    tokens = LEAST(
+        %(burst)s,
+        b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * %(rate)s
+    ) - %(n)s,
+    updated_at = clock_timestamp()
+RETURNING tokens;
+"""
+
+
+def take(tokens, elapsed, rate, burst, n=1):
+    """Refill for `elapsed` seconds, debit n; returns the new balance (may be < 0)."""
+    return min(burst, tokens + elapsed * rate) - n
+
+
+class PostgresBucket:
+    def __init__(self, name, rate, burst):
+        from bina.db import get_conn
+
+        self.name, self.rate, self.burst = name, rate, burst
+        self.conn = get_conn()
+        self.conn.autocommit = True     # never hold the row lock past the upsert
+
+    def reserve(self, n):
+        cur = self.conn.cursor()
+        cur.execute(REFILL_SQL, {"name": self.name, "rate": self.rate, "burst": self.burst, "n": n})
+        return cur.fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class FileBucket:
+    def __init__(self, name, rate, burst, path=None):
+        self.name, self.rate, self.burst = name, rate, burst
+        self.path = path or settings.RATE_LIMIT_FILE
+
+    def reserve(self, n):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        with os.fdopen(fd, "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                state = json.loads(f.read() or "{}")
+            except ValueError:
+                state = {}
+            now = time.time()
+            tokens, updated = state.get(self.name, (self.burst, now))
+            tokens = take(tokens, now - updated, self.rate, self.burst, n)
+            state[self.name] = (tokens, now)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(state))
+            f.flush()
+            return tokens      # flock released on close
+
+    def close(self):
+        pass
+
+
+_bucket = None
+_pid = None
+_degraded_at = None     # last time the Postgres bucket failed
+
+
+def degrade(name, rate, error):
+    """Host-local bucket without bursts, used while Postgres is down."""
+    global _degraded_at
+    _degraded_at = time.time()
+    print(f"[RATE WARNING] Postgres bucket unavailable ({error}) — throttling this host "
+          f"to {rate}/s without bursts; retrying Postgres in {PG_RETRY_SECONDS}s")
+    return FileBucket(name, rate, 1)
+
+
+def bucket():
+    """This process's bucket (re-created after fork: connections don't survive it)."""
+    global _bucket, _pid, _degraded_at
+    if _bucket is not None and _pid == os.getpid():
+        if _degraded_at is None or time.time() - _degraded_at < PG_RETRY_SECONDS:
+            return _bucket
+
+    name = urlparse(settings.BINA_BASE_URL).hostname or "default"
+    rate, burst = settings.RATE_LIMIT_RPS, settings.RATE_LIMIT_BURST
+    backend = settings.RATE_LIMIT_BACKEND
+
+    _bucket = None
+    if backend == "postgres":
+        try:
+            _bucket = PostgresBucket(name, rate, burst)
+            if _degraded_at is not None:
+                print("[RATE] Postgres bucket back — shared budget restored")
+            _degraded_at = None
+        except Exception as e:
+            _bucket = degrade(name, rate, e)
+    elif backend == "file":
+        _bucket = FileBucket(name, rate, burst)
+    _pid = os.getpid()
+    return _bucket
+
+
+def reserve(n=1) -> float:
+    """Debit n requests from the budget; returns how long to wait before sending them."""
+    global _bucket
+    b = bucket()
+    try:
+        tokens = b.reserve(n)
+    except Exception as e:
+        try:
+            b.close()
+        except Exception:
+            pass
+        _bucket = b = degrade(b.name, b.rate, e)
+        tokens = b.reserve(n)
+    return -tokens / b.rate if tokens < 0 else 0.0
+
+
+def acquire(n=1) -> float:
+    """Block until n requests fit in the shared budget; returns seconds waited."""
+    if settings.RATE_LIMIT_BACKEND == "off" or settings.RATE_LIMIT_RPS <= 0:
+        return 0.0
+
+    wait = reserve(n)
+    if wait > 0:
+        time.sleep(wait)
+    metrics.observe(metrics.STAGE_SECONDS, wait, stage="rate_limit_wait")
+    return wait
+
+
+async def acquire_async(n=1) -> float:
+    """acquire() for coroutines: the reservation is one quick upsert, the wait doesn't block the loop."""
+    if settings.RATE_LIMIT_BACKEND == "off" or settings.RATE_LIMIT_RPS <= 0:
+        return 0.0
+
+    wait = reserve(n)
+    if wait > 0:
+        await asyncio.sleep(wait)
+    metrics.observe(metrics.STAGE_SECONDS, wait, stage="rate_limit_wait")
+    return wait
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/reconciler.py
+# ORPHAN RECONCILER
+# ------------------------------------------------
+# consume_one acks before processing, so a crash mid-listing
+# leaves the row is_scraped = false with no message left.
+# This job walks unscraped rows older than a threshold with
+# keyset pagination on listing_id (partial index, no full
+# scan), re-publishes them in confirmed batches at a fixed
+# rate, and backs off while the queue is already deep.
+# ------------------------------------------------
+
+from __future__ import annotations
+import time
+from datetime import timedelta
+
+from bina.config import settings
+from bina.db import get_conn, now_utc
+
+
+ORPHAN_SCAN_SQL = """
+SELECT listing_id, url
+FROM bina_apartments
+WHERE is_scraped = false
+  AND listing_id > %(after)s
+  AND scraped_at < %(cutoff)s
+  AND (requeued_at IS NULL OR requeued_at < %(cutoff)s)
+  AND listing_status <> 'removed'
+  AND url IS NOT NULL
+ORDER BY listing_id
+LIMIT %(batch)s;
+"""
+
+
+def fetch_orphans(after, cutoff, batch):
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(ORPHAN_SCAN_SQL, {"after": after, "cutoff": cutoff, "batch": batch})
+        return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def mark_requeued(listing_ids):
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE bina_apartments SET requeued_at = %s WHERE listing_id = ANY(%s::bigint[]);",
+            (now_utc(), list(listing_ids)),
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print("[DB ERROR] REQUEUE MARK FAILED:", e)
+        raise
+    finally:
+        conn.close()
+
+
+def wait_for_room(rabbit, max_depth, max_wait=300):
+    """Block while the detail queue is deeper than max_depth."""
+    waited = 0
+    while True:
+        depth = rabbit.queue_depth()
+        if depth < max_depth:
+            return True
+        if waited >= max_wait:
+            print(f"[RECONCILE] Queue still at {depth} after {max_wait}s — giving up")
+            return False
+        print(f"[RECONCILE] Queue depth {depth} ≥ {max_depth}, waiting...")
+        time.sleep(10)
+        waited += 10
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(
+    age_minutes=settings.RECONCILE_AGE_MINUTES,
+    batch=settings.RECONCILE_BATCH,
+    rate=settings.RECONCILE_RATE,
+    max_depth=settings.RECONCILE_MAX_QUEUE_DEPTH,
+    max_total=settings.RECONCILE_MAX_PER_RUN,
+):
+    cutoff = now_utc() - timedelta(minutes=age_minutes)
+    interval = 1.0 / rate if rate > 0 else 0.0
+
+    print(f"[RECONCILE] START (older than {age_minutes}m, batch={batch}, "
+          f"rate={rate}/s, max_depth={max_depth})")
+
+    from bina.rabbit import RabbitMQ
+
+    rabbit = RabbitMQ()
+    after = 0
+    requeued = 0
+
+    try:
+        while requeued < max_total:
+            rows = fetch_orphans(after, cutoff, min(batch, max_total - requeued))
+            if not rows:
+                break
+            after = rows[-1][0]
+
+            if not wait_for_room(rabbit, max_depth):
+                break
+
+            # The channel runs in confirm mode: each publish returns only
+            # once the broker has the message, so the batch is confirmed
+            # before it is marked.
+            t0 = time.time()
+            for i, (listing_id, url) in enumerate(rows):
+                rabbit.publish({"listing_id": str(listing_id), "url": url})
+                delay = t0 + (i + 1) * interval - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+
+            mark_requeued(r[0] for r in rows)
+            requeued += len(rows)
+            print(f"[RECONCILE] Re-enqueued {len(rows)} (through listing_id={after})")
+    finally:
+        rabbit.close()
+
+    print(f"[RECONCILE] DONE — {requeued} orphaned listings re-enqueued")
+
+
+if __name__ == "__main__":
+    main()
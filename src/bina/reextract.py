@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/reextract.py
+# OFFLINE RE-EXTRACTION FROM THE HTML ARCHIVE
+# ------------------------------------------------
+# After a parser fix, re-parse the newest archived copy of
+# every card / detail page with bina.html_parsers across a
+# multiprocessing pool, diff the result against Postgres
+# and bulk-update only the rows whose fields changed.
+# Fixing historical data costs CPU time, not a re-crawl.
+#
+# Safety rules:
+#   - a field the parser can't find (None) never overwrites
+#     a stored value
+#   - rows written after the archived copy was taken are
+#     left alone (the database is newer than the archive)
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import os
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+import psycopg2.extras
+
+from bina.config import settings
+from bina.db import get_conn
+from bina.helper import card_fingerprint
+from bina.html_archive import HtmlArchive, read_object, CARD, DETAIL
+from bina.html_parsers import parse_card_html, parse_detail_html, CARD_FIELDS, DETAIL_FIELDS
+
+
+# ===========================================================
+# WORKER (runs in a pool process)
+# ===========================================================
+def parse_entry(args):
+    root, listing_id, kind, sha, codec, fetched_at = args
+    try:
+        html = read_object(root, sha, codec)
+        fields = parse_card_html(html) if kind == CARD else parse_detail_html(html)
+    except Exception as e:
+        print(f"[REEXTRACT] {kind} {listing_id}: {type(e).__name__} {e}")
+        return listing_id, kind, fetched_at, None
+    if fields is not None and kind == CARD:
+        # The archived card is authoritative only for its own listing
+        if fields.pop("listing_id") != listing_id:
+            return listing_id, kind, fetched_at, None
+        fields.pop("url")
+    return listing_id, kind, fetched_at, fields
+
+
+# ===========================================================
+# DIFF
+# ===========================================================
+def same(field, old, new):
+    if field == "description" and old and new:
+        # Selenium .text and lxml itertext() differ in whitespace only
+        return " ".join(old.split()) == " ".join(new.split())
+    if isinstance(old, float) or isinstance(new, float):
+        return old is not None and new is not None and abs(old - new) < 1e-6
+    return old == new
+
+
+def load_current(kind, listing_ids):
+    """listing_id → dict of stored values (plus the staleness timestamp)."""
+    if kind == CARD:
+        columns = CARD_FIELDS + ("has_mortgage", "has_deed")
+        stamp = "scraped_at"
+    else:
+        columns = DETAIL_FIELDS
+        stamp = "refreshed_at"
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT listing_id, {stamp}, {', '.join(columns)} FROM bina_apartments "
+            "WHERE listing_id = ANY(%s::bigint[]);",
+            (list(listing_ids),),
+        )
+        return {
+            str(row[0]): dict(zip(("_stamp",) + columns, row[1:]))
+            for row in cur.fetchall()
+        }
+    finally:
+        conn.close()
+
+
+def diff_batch(kind, results):
+    """Parsed results → rows for the bulk UPDATE (only changed listings)."""
+    fields = CARD_FIELDS if kind == CARD else DETAIL_FIELDS
+    current = load_current(kind, [lid for lid, _, _ in results])
+    updates = []
+
+    for listing_id, fetched_at, parsed in results:
+        stored = current.get(listing_id)
+        if stored is None:
+            continue
+        if stored["_stamp"] and datetime.fromisoformat(fetched_at) < stored["_stamp"]:
+            continue
+
+        merged = {f: (parsed[f] if parsed[f] is not None else stored[f]) for f in fields}
+        if all(same(f, stored[f], merged[f]) for f in fields):
+            continue
+
+        if kind == CARD:
+            merged["has_mortgage"] = stored["has_mortgage"]
+            merged["has_deed"] = stored["has_deed"]
+            merged["content_hash"] = card_fingerprint(merged)
+            updates.append((int(listing_id),) + tuple(merged[f] for f in fields)
+                           + (merged["content_hash"],))
+        else:
+            updates.append((int(listing_id),) + tuple(merged[f] for f in fields))
+
+    return updates
+
+
+CARD_TEMPLATE = (
+    "(%s::bigint, %s::int, %s::int, %s::float, %s::int, "
+    "%s::int, %s::int, %s::text, %s::text, %s::text, %s::text)"
+)
+DETAIL_TEMPLATE = "(%s::bigint, %s::text, %s::text, %s::int, %s::boolean)"
+
+
+def write_updates(kind, updates):
+    if not updates:
+        return
+    if kind == CARD:
+        columns = CARD_FIELDS + ("content_hash",)
+        template = CARD_TEMPLATE
+    else:
+        columns = DETAIL_FIELDS
+        template = DETAIL_TEMPLATE
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        psycopg2.extras.execute_values(
+            cur,
+            f"""
+            UPDATE bina_apartments AS b SET
+                {", ".join(f"{c} = v.{c}" for c in columns)}
+            FROM (VALUES %s) AS v (listing_id, {", ".join(columns)})
+            WHERE b.listing_id = v.listing_id;
+            """,
+            updates,
+            template=template,
+            page_size=1000,
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print("[DB ERROR] REEXTRACT UPDATE FAILED:", e)
+        raise
+    finally:
+        conn.close()
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(kind=None, workers=None, batch=None, dry_run=False):
+    workers = workers or settings.REEXTRACT_WORKERS or os.cpu_count() or 1
+    batch = batch or settings.REEXTRACT_BATCH
+
+    archive = HtmlArchive()
+    entries = [(archive.root,) + tuple(row) for row in archive.latest(kind)]
+    archive.close()
+
+    print(f"[REEXTRACT] START — {len(entries)} archived pages, {workers} workers"
+          f"{' (dry run)' if dry_run else ''}")
+
+    pending = {CARD: [], DETAIL: []}
+    counts = {"parsed": 0, "failed": 0, "changed": 0}
+    start = time.time()
+
+    def flush(k):
+        updates = diff_batch(k, pending[k])
+        counts["changed"] += len(updates)
+        if not dry_run:
+            write_updates(k, updates)
+        pending[k] = []
+
+    with Pool(workers) as pool:
+        for listing_id, k, fetched_at, fields in pool.imap_unordered(parse_entry, entries, chunksize=64):
+            if fields is None:
+                counts["failed"] += 1
+                continue
+            counts["parsed"] += 1
+            pending[k].append((listing_id, fetched_at, fields))
+            if len(pending[k]) >= batch:
+                flush(k)
+
+    for k in (CARD, DETAIL):
+        if pending[k]:
+            flush(k)
+
+    elapsed = time.time() - start
+    print(f"[REEXTRACT] DONE — {counts['parsed']} parsed, {counts['failed']} unparseable, "
+          f"{counts['changed']} rows {'would change' if dry_run else 'updated'} "
+          f"in {elapsed:.1f}s ({counts['parsed'] / elapsed if elapsed else 0:.0f} pages/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-parse archived HTML and fix stored fields")
+    parser.add_argument("--kind", choices=[CARD, DETAIL], help="Only card or detail pages")
+    parser.add_argument("--workers", type=int, help="Pool size (default: CPU count)")
+    parser.add_argument("--batch", type=int, help="Rows diffed and updated per round trip")
+    parser.add_argument("--dry-run", action="store_true", help="Count changes, write nothing")
+    args = parser.parse_args()
+    main(args.kind, args.workers, args.batch, args.dry_run)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/refresh_scheduler.py
+# STALENESS-PRIORITIZED REFRESH SCHEDULER
+# ------------------------------------------------
+# Scraped listings are never visited again, so views and
+# descriptions go stale. Each run scores every scraped
+# listing by age, observed change rate and popularity,
+# keeps the best N in a bounded heap, and pushes only
+# those N as refresh jobs. Crawl cost per window is fixed
+# by REFRESH_PER_WINDOW, not by table size.
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import heapq
+import math
+from datetime import timedelta
+
+from bina.config import settings
+from bina.db import get_conn, now_utc
+
+
+CANDIDATES_SQL = """
+SELECT listing_id, url,
+       COALESCE(refreshed_at, scraped_at) AS last_seen,
+       refresh_count, detail_changes, view_count
+FROM bina_apartments
+WHERE is_scraped = true
+  AND listing_status <> 'removed'
+  AND url IS NOT NULL
+  AND COALESCE(refreshed_at, scraped_at) < %(cutoff)s
+  AND (refresh_queued_at IS NULL OR refresh_queued_at < %(cutoff)s);
+"""
+
+
+def staleness_score(age_hours, refresh_count, detail_changes, view_count):
+    """
+    age × change rate × popularity.
+    The change rate is the smoothed share of past refreshes that found
+    new content, so never-refreshed listings start at 0.5.
+    """
+    change_rate = (detail_changes + 1) / (refresh_count + 2)
+    popularity = 1 + math.log1p(view_count or 0)
+    return age_hours * change_rate * popularity
+
+
+def top_candidates(n, min_age_hours):
+    """Stream candidates through a server-side cursor into a size-n min-heap."""
+    now = now_utc()
+    cutoff = now - timedelta(hours=min_age_hours)
+    heap = []
+    scanned = 0
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor(name="bina_refresh_candidates")
+        cur.itersize = 5000
+        cur.execute(CANDIDATES_SQL, {"cutoff": cutoff})
+
+        for listing_id, url, last_seen, refreshes, changes, views in cur:
+            scanned += 1
+            age_h = (now - last_seen).total_seconds() / 3600 if last_seen else min_age_hours
+            score = staleness_score(age_h, refreshes, changes, views)
+
+            item = (score, listing_id, url)
+            if len(heap) < n:
+                heapq.heappush(heap, item)
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, item)
+        cur.close()
+    finally:
+        conn.close()
+
+    return sorted(heap, reverse=True), scanned
+
+
+def mark_refresh_queued(listing_ids):
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE bina_apartments SET refresh_queued_at = %s WHERE listing_id = ANY(%s::bigint[]);",
+            (now_utc(), list(listing_ids)),
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print("[DB ERROR] REFRESH MARK FAILED:", e)
+        raise
+    finally:
+        conn.close()
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(per_window=settings.REFRESH_PER_WINDOW, min_age_hours=settings.REFRESH_MIN_AGE_HOURS,
+         dry_run=False):
+    jobs, scanned = top_candidates(per_window, min_age_hours)
+    print(f"[REFRESH] Scored {scanned} candidates, selected {len(jobs)}")
+
+    if dry_run:
+        for score, listing_id, url in jobs[:20]:
+            print(f"[REFRESH] {score:10.1f}  {listing_id}  {url}")
+        return
+
+    from bina.rabbit import RabbitMQ
+
+    rabbit = RabbitMQ()
+    try:
+        # Same backpressure limit as the reconciler: don't bury
+        # first-time detail work under refreshes
+        room = max(0, settings.RECONCILE_MAX_QUEUE_DEPTH - rabbit.queue_depth())
+        jobs = jobs[:room]
+
+        for _, listing_id, url in jobs:
+            rabbit.publish({"listing_id": str(listing_id), "url": url, "refresh": True})
+    finally:
+        rabbit.close()
+
+    # A job lost from the queue becomes a candidate again after min_age_hours
+    if jobs:
+        mark_refresh_queued([listing_id for _, listing_id, _ in jobs])
+
+    print(f"[REFRESH] DONE — {len(jobs)} refresh jobs pushed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Push the stalest listings for a detail refresh")
+    parser.add_argument("--limit", type=int, default=settings.REFRESH_PER_WINDOW)
+    parser.add_argument("--min-age-hours", type=float, default=settings.REFRESH_MIN_AGE_HOURS)
+    parser.add_argument("--dry-run", action="store_true", help="Print the top of the queue only")
+    args = parser.parse_args()
+    main(args.limit, args.min_age_hours, args.dry_run)
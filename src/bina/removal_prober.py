@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/removal_prober.py
+# BULK REMOVED-LISTING DETECTION
+# ------------------------------------------------
+# Sold / deleted listings never tell us they are gone.
+# This prober walks listings not checked recently (keyset
+# on listing_id), probes their URLs concurrently with
+# HEAD (GET fallback, body never read) over a bounded
+# aiohttp connection pool, paced by the shared request
+# budget (bina.rate_limit) like every other fetcher, and writes listing_status / removed_at / checked_at back
+# in one bulk UPDATE per batch. No browser involved.
+# ------------------------------------------------
+
+from __future__ import annotations
+import asyncio
+import re
+import time
+from datetime import timedelta
+
+import aiohttp
+import psycopg2.extras
+
+from bina.config import settings
+from bina.db import get_conn, now_utc
+from bina import rate_limit
+
+
+ACTIVE = "active"
+REMOVED = "removed"
+UNKNOWN = None      # transient failure: leave the row for the next run
+
+ITEM_RE = re.compile(r"/items/(\d+)")
+
+PROBE_SCAN_SQL = """
+SELECT listing_id, url
+FROM bina_apartments
+WHERE listing_id > %(after)s
+  AND listing_status <> 'removed'
+  AND (checked_at IS NULL OR checked_at < %(cutoff)s)
+  AND url IS NOT NULL
+ORDER BY listing_id
+LIMIT %(batch)s;
+"""
+
+
+# ===========================================================
+# PROBING
+# ===========================================================
+def classify(listing_id, status, location):
+    if status in (404, 410):
+        return REMOVED
+    if 300 <= status < 400:
+        # Removed items redirect to a search / home page
+        m = ITEM_RE.search(location or "")
+        return ACTIVE if m and m.group(1) == str(listing_id) else REMOVED
+    if 200 <= status < 300:
+        return ACTIVE
+    return UNKNOWN
+
+
+async def probe(session, listing_id, url):
+    try:
+        await rate_limit.acquire_async()
+        async with session.head(url, allow_redirects=False) as resp:
+            status, location = resp.status, resp.headers.get("Location")
+
+        if status == 405:  # HEAD not allowed: GET headers only
+            await rate_limit.acquire_async()
+            async with session.get(url, allow_redirects=False) as resp:
+                status, location = resp.status, resp.headers.get("Location")
+
+        return listing_id, classify(listing_id, status, location)
+    except Exception as e:
+        print(f"[PROBE] {listing_id}: {type(e).__name__} {e}")
+        return listing_id, UNKNOWN
+
+
+async def probe_batch(rows, concurrency):
+    timeout = aiohttp.ClientTimeout(total=settings.SELENIUM_PAGE_LOAD_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    headers = {"User-Agent": settings.HTTP_USER_AGENT}
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers=headers) as session:
+        return await asyncio.gather(*(probe(session, lid, url) for lid, url in rows))
+
+
+# ===========================================================
+# DB
+# ===========================================================
+def fetch_batch(after, cutoff, batch):
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(PROBE_SCAN_SQL, {"after": after, "cutoff": cutoff, "batch": batch})
+        return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def write_results(results):
+    """One UPDATE ... FROM (VALUES ...) for the whole batch."""
+    ts = now_utc()
+    values = [(lid, status, ts) for lid, status in results if status is not UNKNOWN]
+    if not values:
+        return
+
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        psycopg2.extras.execute_values(
+            cur,
+            """
+            UPDATE bina_apartments AS b SET
+                listing_status = v.status,
+                removed_at = CASE WHEN v.status = 'removed'
+                                  THEN COALESCE(b.removed_at, v.ts) ELSE NULL END,
+                checked_at = v.ts
+            FROM (VALUES %s) AS v (listing_id, status, ts)
+            WHERE b.listing_id = v.listing_id;
+            """,
+            values,
+            template="(%s::bigint, %s::text, %s::timestamp)",
+            page_size=1000,
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print("[DB ERROR] PROBE UPDATE FAILED:", e)
+        raise
+    finally:
+        conn.close()
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(batch=settings.PROBE_BATCH, concurrency=settings.PROBE_CONCURRENCY, max_batches=None):
+    cutoff = now_utc() - timedelta(hours=settings.PROBE_RECHECK_HOURS)
+    counts = {ACTIVE: 0, REMOVED: 0, UNKNOWN: 0}
+    after = 0
+    batches = 0
+    start = time.time()
+
+    print(f"[PROBE] START (batch={batch}, concurrency={concurrency}, "
+          f"shared budget {settings.RATE_LIMIT_RPS}/s)")
+
+    while max_batches is None or batches < max_batches:
+        rows = fetch_batch(after, cutoff, batch)
+        if not rows:
+            break
+        after = rows[-1][0]
+
+        t0 = time.time()
+        results = asyncio.run(probe_batch(rows, concurrency))
+        write_results(results)
+        batches += 1
+
+        for _, status in results:
+            counts[status] += 1
+        print(f"[PROBE] Batch {batches}: {len(rows)} probed in {time.time() - t0:.1f}s "
+              f"(through listing_id={after})")
+
+    total = sum(counts.values())
+    elapsed = time.time() - start
+    print(f"[PROBE] DONE — {total} checked in {elapsed:.0f}s "
+          f"({total / elapsed if elapsed else 0:.1f}/s): {counts[ACTIVE]} active, "
+          f"{counts[REMOVED]} removed, {counts[UNKNOWN]} inconclusive")
+
+
+if __name__ == "__main__":
+    main()
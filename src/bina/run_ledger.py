@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/run_ledger.py
+# PERSISTENT RUN LEDGER + REGRESSION REPORT
+# ------------------------------------------------
+# Every producer / detail run writes one scrape_runs row
+# (items, skips, errors, bytes fetched, browser restarts,
+# items/sec, p95 item latency) instead of a DONE line that
+# scrolls out of the log. The report compares each recent
+# run with the median of the runs of the same mode before
+# it and flags the ones whose throughput dropped by more
+# than the threshold — a site slowdown and our own
+# regression both show up the same day.
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import socket
+import statistics
+import sys
+from datetime import timedelta
+
+from bina.config import settings
+from bina.db import get_conn, now_utc
+from bina.helper import percentile
+
+
+# Sum of bytes transferred for the current page (document + every
+# resource it loaded, XHR scroll pages included). Cache hits count 0.
+TRANSFER_BYTES_JS = """
+var total = 0;
+performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .forEach(function (e) { total += e.transferSize || 0; });
+return total;
+"""
+
+
+def page_transfer_bytes(driver) -> int:
+    try:
+        return int(driver.execute_script(TRANSFER_BYTES_JS) or 0)
+    except Exception:
+        return 0
+
+
+class RunLedger:
+    """Counts one run in memory; finish() writes its scrape_runs row."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.started_at = now_utc()
+        self.items = 0          # pages actually rendered and parsed
+        self.skips = 0          # answered without a render
+        self.errors = 0
+        self.bytes_fetched = 0
+        self.browser_restarts = 0
+        self.durations = []     # seconds per item
+
+    def item(self, seconds: float):
+        self.items += 1
+        self.durations.append(seconds)
+
+    def skip(self):
+        """A message handled without a render: not throughput, just counted."""
+        self.skips += 1
+
+    def error(self):
+        self.errors += 1
+
+    def restart(self):
+        self.browser_restarts += 1
+
+    def add_bytes(self, n: int):
+        self.bytes_fetched += n
+
+    def finish(self):
+        finished_at = now_utc()
+        elapsed = (finished_at - self.started_at).total_seconds()
+        per_sec = self.items / elapsed if elapsed > 0 else 0.0
+        p95 = percentile(self.durations, 95)
+        p95_ms = p95 * 1000 if p95 is not None else None
+
+        print(f"[LEDGER] {self.mode}: {self.items} items, {self.skips} skips, {self.errors} errors, "
+              f"{per_sec:.2f}/s, p95 {p95_ms or 0:.0f} ms, "
+              f"{self.bytes_fetched / 1024 / 1024:.1f} MB, {self.browser_restarts} restarts")
+
+        conn = None
+        try:
+            conn = get_conn()
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO scrape_runs (
+                    mode, host, started_at, finished_at, items, skips, errors,
+                    bytes_fetched, browser_restarts, items_per_sec, p95_item_ms
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+                """,
+                (self.mode, socket.gethostname(), self.started_at, finished_at,
+                 self.items, self.skips, self.errors, self.bytes_fetched, self.browser_restarts,
+                 per_sec, p95_ms),
+            )
+            conn.commit()
+        except Exception as e:
+            # The ledger is bookkeeping: never fail a finished run over it
+            print(f"[DB ERROR] RUN LEDGER INSERT FAILED: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+# ===========================================================
+# REGRESSION REPORT
+# ===========================================================
+def fetch_runs(since, lookback):
+    """Runs since `since`, plus up to `lookback` earlier runs per mode for the baseline."""
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT id, mode, started_at, items, errors, items_per_sec, p95_item_ms
+            FROM (
+                SELECT r.*,
+                       row_number() OVER (PARTITION BY mode ORDER BY started_at DESC) AS rn,
+                       count(*) FILTER (WHERE started_at >= %(since)s)
+                           OVER (PARTITION BY mode) AS recent
+                FROM scrape_runs r
+            ) t
+            WHERE rn <= recent + %(lookback)s
+            ORDER BY mode, started_at;
+            """,
+            {"since": since, "lookback": lookback},
+        )
+        return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def find_regressions(runs, since, baseline_runs, threshold, min_items):
+    """
+    runs: (id, mode, started_at, items, errors, items_per_sec, p95_item_ms)
+    ordered by mode, started_at. A run is compared with the median
+    items/sec of the previous `baseline_runs` runs of its mode (runs
+    with fewer than min_items items are too noisy to judge or to
+    serve as baseline).
+    """
+    flagged = []
+    history = {}
+
+    for run in runs:
+        _, mode, started_at, items, _, per_sec, _ = run
+        previous = history.setdefault(mode, [])
+        if items >= min_items:
+            if started_at >= since and len(previous) >= 3:
+                baseline = statistics.median(previous[-baseline_runs:])
+                if baseline > 0 and per_sec < baseline * (1 - threshold):
+                    flagged.append((run, baseline))
+            previous.append(per_sec)
+
+    return flagged
+
+
+def report(hours, baseline_runs, threshold, min_items):
+    since = now_utc() - timedelta(hours=hours)
+    runs = fetch_runs(since, baseline_runs)
+    recent = [r for r in runs if r[2] >= since]
+    flagged = find_regressions(runs, since, baseline_runs, threshold, min_items)
+
+    print(f"[LEDGER] {len(recent)} runs in the last {hours}h "
+          f"(threshold {threshold:.0%} below the median of {baseline_runs} previous runs)")
+    for (run_id, mode, started_at, items, errors, per_sec, p95), baseline in flagged:
+        drop = (1 - per_sec / baseline) * 100
+        print(f"[LEDGER] ⚠ REGRESSION run {run_id} {mode} @ {started_at:%Y-%m-%d %H:%M}: "
+              f"{per_sec:.2f}/s vs baseline {baseline:.2f}/s (-{drop:.0f}%), "
+              f"{items} items, {errors} errors, p95 {p95 or 0:.0f} ms")
+    if not flagged:
+        print("[LEDGER] No throughput regressions")
+    return flagged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="scrape_runs regression report")
+    parser.add_argument("--hours", type=float, default=24, help="Judge runs started in the last N hours")
+    parser.add_argument("--baseline-runs", type=int, default=settings.LEDGER_BASELINE_RUNS)
+    parser.add_argument("--threshold", type=float, default=settings.LEDGER_REGRESSION_THRESHOLD,
+                        help="Flag runs this fraction below the baseline (0.3 = 30%%)")
+    parser.add_argument("--min-items", type=int, default=5)
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit 1 when a run is flagged (fails the Airflow task)")
+    args = parser.parse_args()
+
+    flagged = report(args.hours, args.baseline_runs, args.threshold, args.min_items)
+    if flagged and args.fail_on_regression:
+        sys.exit(1)
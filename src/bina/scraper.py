@@ -0,0 +1,44 @@
+# /opt/Etl_server_project_1/src/bina/scraper.py
+# MANAGED BROWSER FOR THE CARDS-ONLY PIPELINE
+# ------------------------------------------------
+# One Chromium per SeleniumDriver, started on first use
+# and quit by close(), so src/main.py owns exactly one
+# browser for the whole run.
+# ------------------------------------------------
+
+from __future__ import annotations
+
+from bina.config import settings
+from bina.browser import get_driver
+from bina import rate_limit
+
+
+class SeleniumDriver:
+    def __init__(self):
+        self._driver = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = get_driver()
+            self._driver.set_script_timeout(settings.SCROLL_ROUND_TIMEOUT + 5)
+        return self._driver
+
+    def get(self, url):
+        """Load url, retrying SELENIUM_RETRY_COUNT times on a failed load."""
+        for attempt in range(settings.SELENIUM_RETRY_COUNT + 1):
+            rate_limit.acquire()
+            try:
+                self.driver.get(url)
+                return
+            except Exception as e:
+                if attempt == settings.SELENIUM_RETRY_COUNT:
+                    raise
+                print(f"[browser] Load failed ({e.__class__.__name__}), retrying {url}")
+
+    def close(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            finally:
+                self._driver = None
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# /opt/Etl_server_project_1/src/bina/sitemap_discovery.py
+# SITEMAP-DRIVEN LISTING DISCOVERY
+# ------------------------------------------------
+# Walks the sitemap index and its listing sitemaps
+# (plain or gzipped) with lxml iterparse, so memory stays
+# constant no matter how many URLs a sitemap holds.
+# Discovered IDs are diffed against bina_apartments in
+# bulk; only unknown listings are inserted and published.
+# Local paths work as well as URLs (see tests/fixtures).
+# ------------------------------------------------
+
+from __future__ import annotations
+import argparse
+import gzip
+import io
+import os
+import re
+from urllib.parse import urljoin
+
+from lxml import etree
+
+from bina.config import settings
+
+
+ITEM_RE = re.compile(r"/items/(\d+)")
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+# ----------------------------------------------------------
+# SOURCES
+# ----------------------------------------------------------
+def is_remote(loc: str) -> bool:
+    return loc.startswith(("http://", "https://"))
+
+
+def resolve(parent: str, loc: str) -> str:
+    """Child sitemap locations are resolved against their index."""
+    if is_remote(loc) or os.path.isabs(loc):
+        return loc
+    if is_remote(parent):
+        return urljoin(parent, loc)
+    return os.path.join(os.path.dirname(parent), loc)
+
+
+def open_sitemap(loc: str):
+    """
+    Return a binary stream for a sitemap, transparently gunzipping
+    .xml.gz payloads (detected by magic bytes, not by file name).
+    """
+    if is_remote(loc):
+        import requests
+        from bina import rate_limit
+
+        rate_limit.acquire()
+        resp = requests.get(loc, stream=True, timeout=settings.SELENIUM_PAGE_LOAD_TIMEOUT,
+                            headers={"User-Agent": settings.HTTP_USER_AGENT})
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+        raw = resp.raw
+    else:
+        raw = open(loc, "rb")
+
+    stream = io.BufferedReader(raw) if not hasattr(raw, "peek") else raw
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+# ----------------------------------------------------------
+# STREAMING PARSE
+# ----------------------------------------------------------
+def iter_entries(loc: str):
+    """
+    Yield ("sitemap" | "url", loc) for every entry of one sitemap file.
+    Elements are cleared as soon as they are read.
+    """
+    stream = open_sitemap(loc)
+    try:
+        for _, elem in etree.iterparse(stream, events=("end",),
+                                       tag=("{*}sitemap", "{*}url")):
+            kind = etree.QName(elem).localname
+            child = elem.find("{*}loc")
+            if child is not None and child.text:
+                yield kind, child.text.strip()
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    finally:
+        stream.close()
+
+
+def iter_listings(root: str, child_filter: str = ""):
+    """
+    Walk an index (or a single urlset) depth-first and yield
+    (listing_id, url) for every /items/<id> URL.
+    """
+    pending = [root]
+    while pending:
+        loc = pending.pop()
+        for kind, value in iter_entries(loc):
+            if kind == "sitemap":
+                if child_filter and child_filter not in value:
+                    continue
+                pending.append(resolve(loc, value))
+                continue
+
+            m = ITEM_RE.search(value)
+            if m:
+                yield int(m.group(1)), value
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main(roots=None, dry_run=False, batch_size=5000):
+    roots = roots or [settings.SITEMAP_URL]
+
+    rabbit = None
+    if not dry_run:
+        from bina.db import existing_listing_ids, insert_discovered_listings
+        from bina.rabbit import RabbitMQ
+        rabbit = RabbitMQ()
+
+    seen = 0
+    emitted = 0
+
+    try:
+        for root in roots:
+            print(f"[SITEMAP] Reading {root}")
+            listings = iter_listings(root, settings.SITEMAP_CHILD_FILTER)
+
+            for batch in batched(listings, batch_size):
+                seen += len(batch)
+
+                # Dedupe within the batch before the bulk diff
+                by_id = dict(batch)
+                if dry_run:
+                    new = by_id
+                else:
+                    known = existing_listing_ids(list(by_id))
+                    new = {lid: url for lid, url in by_id.items() if lid not in known}
+
+                if new and not dry_run:
+                    insert_discovered_listings(new.items())
+                    for lid, url in new.items():
+                        rabbit.publish({"listing_id": str(lid), "url": url})
+
+                emitted += len(new)
+                print(f"[SITEMAP] Batch: {len(batch)} URLs, {len(new)} new")
+    finally:
+        if rabbit:
+            rabbit.close()
+
+    print(f"[SITEMAP] DONE — {seen} listing URLs, {emitted} new"
+          f"{' (dry run)' if dry_run else ''}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Discover listings from bina.az sitemaps")
+    parser.add_argument("roots", nargs="*", help="Sitemap index URLs or local paths")
+    parser.add_argument("--dry-run", action="store_true", help="Parse only; no DB diff or publish")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.roots, args.dry_run, args.batch_size)
@@ -11,7 +11,7 @@ Modes:
 Notes:
   * No per-listing page opens (fast).
   * No DDL here; run schema.sql manually once.
-  * One DB connection per run; new cursor per query.
+  * One pooled DB client per run (bina.db.DBClient); new cursor per query.
   * posted_at saved as naive UTC (TIMESTAMP WITHOUT TIME ZONE).
 """
 
@@ -19,10 +19,7 @@ import argparse
 import time
 from pathlib import Path
 from bina.config import settings
-from bina.db import DBClient
-from bina.scraper import SeleniumDriver
-from bina.pipeline import Pipeline
-from bina.rabbit import RabbitMQ
+from bina.profiling import profiled, MODES as PROFILE_MODES
 
 HEARTBEAT_PATH = "/opt/airflow/tmp/etl_heartbeat"
 
@@ -43,15 +40,27 @@ def main() -> None:
     parser.add_argument("--verify-only", action="store_true", help="Check reachability only")
     parser.add_argument("--initial", action="store_true", help="Run initial load")
     parser.add_argument("--incremental", action="store_true", help="Run incremental update")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="Profile the run (default: BINA_PROFILE)")
     args = parser.parse_args()
 
     if not (args.verify_only or args.initial or args.incremental):
         parser.error("Choose one: --verify-only OR --initial OR --incremental")
 
+    with profiled("etl", args.profile):
+        run(args)
+
+
+def run(args) -> None:
+    # Imported here so argparse errors and --help stay instant
+    from bina.db import DBClient
+    from bina.scraper import SeleniumDriver
+    from bina.pipeline import Pipeline
+
     db = DBClient()
     browser = SeleniumDriver()
     pipe = Pipeline(db, browser)
-    rabbit = RabbitMQ()
+    rabbit = None
 
     mode = (
         "verify"
@@ -80,6 +89,8 @@ def main() -> None:
         new_listings = pipe.run(max_new=max_new)
 
         if new_listings:
+            from bina.rabbit import RabbitMQ
+            rabbit = RabbitMQ()
             for item in new_listings:
                 payload = {"listing_id": item["id"], "url": item["url"]}
                 rabbit.publish(payload)
@@ -97,6 +108,8 @@ def main() -> None:
 
     finally:
         for name, obj in {"rabbit": rabbit, "browser": browser, "db": db}.items():
+            if obj is None:
+                continue
             try:
                 obj.close()
             except Exception as e:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# tests/bench_browser.py
+#
+# Cold vs warm browser start. Each round starts a driver, loads the
+# page and waits for the first card, then quits:
+#   cold   throwaway profile (what every run paid before the pool)
+#   warm   pooled persistent profile, primed by one unmeasured load
+# Reports driver start time, first-page latency (load → first card)
+# and bytes transferred for that page, medians over --rounds, in a
+# JSON report stamped with the git commit like bench_parsers.
+#
+#   PYTHONPATH=src python tests/bench_browser.py
+#   PYTHONPATH=src python tests/bench_browser.py --url http://127.0.0.1:8765/feed
+#       (e.g. the soak harness site; needs chromium + chromedriver)
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS = os.path.join(HERE, "bench_results")
+
+
+def measure(get_driver, url, persistent):
+    from bina.listing_producer import wait_for_first_cards
+    from bina.run_ledger import page_transfer_bytes
+
+    t0 = time.perf_counter()
+    driver = get_driver(persistent=persistent)
+    started = time.perf_counter() - t0
+    try:
+        t1 = time.perf_counter()
+        driver.get(url)
+        wait_for_first_cards(driver)
+        first_page = time.perf_counter() - t1
+        transferred = page_transfer_bytes(driver)
+    finally:
+        driver.quit()
+    return started, first_page, transferred
+
+
+def summarize(samples):
+    starts, pages, sizes = zip(*samples)
+    return {
+        "rounds": len(samples),
+        "start_s": round(statistics.median(starts), 3),
+        "first_page_s": round(statistics.median(pages), 3),
+        "transfer_kb": round(statistics.median(sizes) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm-profile browser start")
+    parser.add_argument("--url", help="Page to load (default: BINA_BASE_URL)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--profile-dir", help="Profile pool to use (default: a temporary one)")
+    parser.add_argument("--out", help="Report path (default: tests/bench_results/browser-<commit>.json)")
+    args = parser.parse_args()
+
+    # Settings are read at import: point the pool somewhere disposable first
+    pool = args.profile_dir or tempfile.mkdtemp(prefix="bina-profiles-")
+    os.environ["BINA_BROWSER_PROFILE_DIR"] = pool
+    sys.path.insert(0, os.path.join(HERE, "..", "src"))
+    from bina.config import settings
+    from bina.browser import get_driver
+    from bench_common import git_commit
+
+    url = args.url or settings.BINA_BASE_URL
+    commit, dirty = git_commit()
+    print(f"[BENCH] {url}, {args.rounds} rounds, pool {pool} @ {commit[:10]}"
+          f"{' (dirty)' if dirty else ''}")
+
+    cold = [measure(get_driver, url, persistent=False) for _ in range(args.rounds)]
+    measure(get_driver, url, persistent=True)   # prime the cache
+    warm = [measure(get_driver, url, persistent=True) for _ in range(args.rounds)]
+
+    results = {"cold": summarize(cold), "warm": summarize(warm)}
+    for name, res in results.items():
+        print(f"[BENCH] {name:5s} start {res['start_s']:.2f}s  first page {res['first_page_s']:.2f}s  "
+              f"transfer {res['transfer_kb']:.0f} KB")
+    c, w = results["cold"], results["warm"]
+    if c["first_page_s"]:
+        print(f"[BENCH] warm cache: first page {(1 - w['first_page_s'] / c['first_page_s']) * 100:+.0f}% faster, "
+              f"{c['transfer_kb'] - w['transfer_kb']:.0f} KB less transferred")
+
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "url": url,
+        "disk_cache_mb": settings.BROWSER_DISK_CACHE_MB,
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS, f"browser-{commit[:10]}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
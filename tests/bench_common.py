@@ -0,0 +1,15 @@
+# tests/bench_common.py
+#
+# Stdlib-only helpers shared by the bench_* scripts, so a benchmark
+# doesn't pull in another one's dependencies (bench_parsers → lxml).
+
+import os
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=HERE, capture_output=True, text=True).stdout.strip()
+    return git("rev-parse", "HEAD") or "unknown", bool(git("status", "--porcelain"))
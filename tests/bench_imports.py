@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# tests/bench_imports.py
+#
+# Import-time benchmark for every `python -m bina` command module.
+# Each module is imported in a fresh interpreter under
+# `python -X importtime`; the report has the median wall time over
+# `python -c pass`, the cumulative import time, and the heaviest
+# top-level imports behind it. Stamped with the git commit like
+# bench_parsers, so a new eager import shows up as a diff.
+#
+#   PYTHONPATH=src python tests/bench_imports.py
+#   PYTHONPATH=src python tests/bench_imports.py --compare tests/bench_results/imports-abc1234.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS = os.path.join(HERE, "bench_results")
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+from bina.__main__ import COMMANDS          # noqa: E402  (imports nothing heavy)
+from bench_common import git_commit         # noqa: E402
+
+
+def wall_time(code, rounds):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def import_profile(module, top):
+    """
+    Cumulative µs of `module` and its heaviest direct imports, from
+    -X importtime (children are printed before their parent, indented
+    two spaces per level).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return None, [proc.stderr.strip().splitlines()[-1]]
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+
+    end = next(i for i, row in enumerate(rows) if row[0] == 0 and row[2] == module)
+    direct = []
+    for depth, cumulative, name in reversed(rows[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((cumulative, name))
+
+    direct.sort(reverse=True)
+    return rows[end][1], [f"{name} {us / 1000:.1f} ms" for us, name in direct[:top]]
+
+
+def compare(report, old_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    print(f"\n[BENCH] vs {old['commit'][:10]} ({old['created_at']})")
+    for name, res in report["results"].items():
+        prev = old["results"].get(name)
+        if not prev:
+            continue
+        print(f"[BENCH] {name:12s} {prev['wall_ms']:>8.1f} → {res['wall_ms']:>8.1f} ms "
+              f"({res['wall_ms'] - prev['wall_ms']:+.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the bina commands")
+    parser.add_argument("--rounds", type=int, default=5, help="Fresh interpreters per module (median)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports listed per module")
+    parser.add_argument("--out", help="Report path (default: tests/bench_results/imports-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier report to diff against")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    baseline = wall_time("pass", args.rounds)
+    print(f"[BENCH] interpreter start {baseline * 1000:.1f} ms @ {commit[:10]}"
+          f"{' (dirty)' if dirty else ''}")
+
+    results = {}
+    for command, (module, _) in COMMANDS.items():
+        cumulative, heavy = import_profile(module, args.top)
+        if cumulative is None:
+            print(f"[BENCH] {command:12s} import failed: {heavy[0]}")
+            continue
+        wall = wall_time(f"import {module}", args.rounds) - baseline
+        results[command] = {
+            "module": module,
+            "wall_ms": round(wall * 1000, 1),
+            "cumulative_ms": round(cumulative / 1000, 1),
+            "heaviest": heavy,
+        }
+        print(f"[BENCH] {command:12s} {wall * 1000:>8.1f} ms  ({', '.join(heavy[:3])})")
+
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rounds": args.rounds,
+        "interpreter_ms": round(baseline * 1000, 1),
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS, f"imports-{commit[:10]}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Report written to {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# tests/bench_parsers.py
+#
+# Offline parser benchmarks over the synthetic pages in
+# tests/fixtures/html: hand-built markup that mimics bina.az's
+# current and old layouts (24 generated cards with sequential ids,
+# three detail variants), served by a local static server for the
+# browser benchmarks. They track relative parser cost from commit
+# to commit; they are not production page timings.
+# Measures items/sec plus peak and retained Python memory
+# (tracemalloc) and writes a JSON report stamped with the git
+# commit, so runs can be compared across commits.
+#
+#   PYTHONPATH=src python tests/bench_parsers.py
+#       lxml parsers + bina.helper, report in tests/bench_results/
+#
+#   PYTHONPATH=src python tests/bench_parsers.py --selenium
+#       also the Selenium extractors (needs chromium + chromedriver)
+#
+#   PYTHONPATH=src python tests/bench_parsers.py --compare tests/bench_results/parsers-abc1234.json
+#       print the change against an earlier report
+
+import argparse
+import contextlib
+import functools
+import glob
+import json
+import os
+import platform
+import statistics
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from lxml import html as lxml_html
+
+from bench_common import git_commit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures", "html")
+RESULTS = os.path.join(HERE, "bench_results")
+
+
+# ========================
+# FIXTURES
+# ========================
+def load_fixtures():
+    with open(os.path.join(FIXTURES, "feed_page.html"), encoding="utf-8") as f:
+        feed = f.read()
+    cards = [
+        lxml_html.tostring(el, encoding="unicode")
+        for el in lxml_html.fromstring(feed).xpath("//div[@data-cy='item-card']")
+    ]
+    details = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "detail_*.html"))):
+        with open(path, encoding="utf-8") as f:
+            details[os.path.basename(path)] = f.read()
+    return feed, cards, details
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_fixtures():
+    handler = functools.partial(QuietHandler, directory=FIXTURES)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ========================
+# MEASUREMENT
+# ========================
+@contextlib.contextmanager
+def quiet():
+    """The extractors print per field; keep that out of the timings."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def bench(func, items, rounds, repeat):
+    """
+    func() processes `items` items. Timed `rounds` times over `repeat`
+    calls each (median reported), then once more under tracemalloc.
+    """
+    rates = []
+    with quiet():
+        func()  # warm-up
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                func()
+            rates.append(items * repeat / (time.perf_counter() - t0))
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "items": items,
+        "per_sec": round(statistics.median(rates), 1),
+        "per_sec_best": round(max(rates), 1),
+        "peak_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((current - before) / 1024, 1),
+    }
+
+
+# ========================
+# BENCHMARKS
+# ========================
+def lxml_benchmarks(cards, details, rounds, repeat):
+    from bina.html_parsers import parse_card_html, parse_detail_html
+
+    pages = list(details.values())
+    return {
+        "lxml_cards": bench(lambda: [parse_card_html(c) for c in cards], len(cards), rounds, repeat),
+        "lxml_details": bench(lambda: [parse_detail_html(p) for p in pages], len(pages), rounds, repeat),
+    }
+
+
+def helper_benchmarks(cards, rounds, repeat):
+    from bina.helper import clean_text, safe_int, safe_float, card_fingerprint
+    from bina.html_parsers import parse_card_html
+
+    rows = [parse_card_html(c) for c in cards]
+    prices = [f"{r['price_azn']:,}".replace(",", " ") for r in rows]
+    texts = [f"  {r['location_area']}   \n {r['location_city']} " for r in rows]
+    floats = ["1 294,73", "58.5 m²", "27173.9", "", "abc", "0,5"] * 4
+    repeat *= 20  # each call is microseconds
+
+    return {
+        "helper_safe_int": bench(lambda: [safe_int(p) for p in prices], len(prices), rounds, repeat),
+        "helper_safe_float": bench(lambda: [safe_float(f) for f in floats], len(floats), rounds, repeat),
+        "helper_clean_text": bench(lambda: [clean_text(t) for t in texts], len(texts), rounds, repeat),
+        "helper_card_fingerprint": bench(lambda: [card_fingerprint(r) for r in rows], len(rows), rounds, repeat),
+    }
+
+
+def selenium_benchmarks(details, rounds, repeat):
+    from selenium.webdriver.common.by import By
+    from bina.browser import get_driver
+    from bina.listing_producer import extract_card, CARD_SELECTOR
+    from bina.detail_scraper import (
+        extract_description, extract_posted_by, extract_view_count, extract_is_constructed,
+    )
+
+    server, base = serve_fixtures()
+    driver = get_driver()
+    results = {}
+    try:
+        t0 = time.perf_counter()
+        driver.get(f"{base}/feed_page.html")
+        results["selenium_feed_load_s"] = round(time.perf_counter() - t0, 3)
+
+        cards = driver.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)
+        results["selenium_cards"] = bench(
+            lambda: [extract_card(c) for c in cards], len(cards), rounds, repeat,
+        )
+
+        # The phone extractor is left out: its cost is the reveal
+        # click and fixed waits, not parsing.
+        def all_details():
+            for name in details:
+                driver.get(f"{base}/{name}")
+                extract_description(driver)
+                extract_posted_by(driver)
+                extract_view_count(driver)
+                extract_is_constructed(driver)
+
+        results["selenium_details_with_load"] = bench(all_details, len(details), rounds, 1)
+    finally:
+        driver.quit()
+        server.shutdown()
+    return results
+
+
+# ========================
+# REPORT
+# ========================
+def compare(report, old_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    print(f"\n[BENCH] vs {old['commit'][:10]} ({old['created_at']})")
+    for name, res in report["results"].items():
+        prev = old["results"].get(name)
+        if not isinstance(res, dict) or not isinstance(prev, dict):
+            continue
+        delta = (res["per_sec"] - prev["per_sec"]) / prev["per_sec"] * 100
+        print(f"[BENCH] {name:28s} {prev['per_sec']:>12.1f} → {res['per_sec']:>12.1f}/s "
+              f"({delta:+.1f}%)  peak {prev['peak_kb']} → {res['peak_kb']} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser benchmarks over synthetic HTML fixtures")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark (median)")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per timed round")
+    parser.add_argument("--selenium", action="store_true", help="Also benchmark the browser extractors")
+    parser.add_argument("--out", help="Report path (default: tests/bench_results/parsers-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier report to diff against")
+    args = parser.parse_args()
+
+    feed, cards, details = load_fixtures()
+    commit, dirty = git_commit()
+    print(f"[BENCH] {len(cards)} cards, {len(details)} detail pages @ {commit[:10]}"
+          f"{' (dirty)' if dirty else ''}")
+
+    results = {}
+    results.update(lxml_benchmarks(cards, details, args.rounds, args.repeat))
+    results.update(helper_benchmarks(cards, args.rounds, args.repeat))
+    if args.selenium:
+        results.update(selenium_benchmarks(details, args.rounds, max(1, args.repeat // 10)))
+
+    for name, res in results.items():
+        if isinstance(res, dict):
+            print(f"[BENCH] {name:28s} {res['per_sec']:>12.1f}/s  "
+                  f"peak {res['peak_kb']:>8.1f} KB  retained {res['retained_kb']:>7.1f} KB")
+        else:
+            print(f"[BENCH] {name:28s} {res}")
+
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "rounds": args.rounds,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS, f"parsers-{commit[:10]}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Report written to {out}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# tests/page_cache_server.py
+#
+# Local stand-in for bina.az detail pages that emits ETag and
+# Last-Modified and answers conditional requests with 304.
+#
+#   python tests/page_cache_server.py --port 8765 --change-every 3
+#       serve /items/<id>; every 3rd request per item changes the page
+#
+#   PYTHONPATH=src python tests/page_cache_server.py --check
+#       start the server in-process, run bina.page_cache against it
+#       and print hit / miss counts
+
+import argparse
+import hashlib
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class DetailHandler(BaseHTTPRequestHandler):
+    change_every = 0
+    hits = {}
+    versions = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if not self.path.startswith("/items/"):
+            self.send_error(404)
+            return
+        listing_id = self.path.rsplit("/", 1)[-1]
+
+        with self.lock:
+            n = self.hits.get(listing_id, 0) + 1
+            self.hits[listing_id] = n
+            if listing_id not in self.versions:
+                self.versions[listing_id] = (0, time.time())
+            if self.change_every and n % self.change_every == 0:
+                self.versions[listing_id] = (self.versions[listing_id][0] + 1, time.time())
+            version, modified = self.versions[listing_id]
+
+        body = (
+            f"<html><body><div id='read-more'>Listing {listing_id} description v{version}</div>"
+            f"<span class='product-statistics__i-text'>Baxışların sayı: {100 + version}</span>"
+            f"</body></html>"
+        ).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        last_modified = formatdate(int(modified), usegmt=True)
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port, change_every):
+    DetailHandler.change_every = change_every
+    server = ThreadingHTTPServer(("127.0.0.1", port), DetailHandler)
+    return server
+
+
+def check(change_every):
+    from bina.page_cache import PageCache
+
+    server = serve(0, change_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(root=tmp, max_bytes=10 * 1024 * 1024, timeout=5)
+        for _ in range(4):
+            for listing_id in range(1, 6):
+                status = cache.fetch(listing_id, f"{base}/items/{listing_id}")
+                print(f"[TEST] {listing_id}: {status}")
+        cache.report()
+        cache.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--change-every", type=int, default=3,
+                        help="Change an item's page every N requests (0 = never)")
+    parser.add_argument("--check", action="store_true",
+                        help="Run bina.page_cache against an in-process server")
+    args = parser.parse_args()
+
+    if args.check:
+        check(args.change_every)
+    else:
+        print(f"[TEST] Serving detail pages on http://127.0.0.1:{args.port}/items/<id>")
+        serve(args.port, args.change_every).serve_forever()
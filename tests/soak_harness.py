@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# tests/soak_harness.py
+#
+# End-to-end soak test of producer → queue → detail → Postgres
+# against a synthetic bina.az served locally, so throughput and
+# memory can be checked before a deploy instead of in production.
+#
+# The synthetic site serves an infinite-scroll feed of --items cards
+# and a detail page per item, each response delayed by --latency-ms
+# (+ up to --jitter-ms). The real listing_producer.main() and
+# detail_scraper.main() run in their own processes; by default they
+# share an in-memory stand-in for RabbitMQ, --queue rabbit uses the
+# broker from the environment instead.
+#
+# The target is a throwaway Postgres database (--db-name, never the
+# production one): --setup-db creates the schema, and every run
+# starts from empty tables unless --keep-data is given.
+#
+#   PYTHONPATH=src DB_HOST=127.0.0.1 python tests/soak_harness.py --setup-db --items 300 --workers 3
+#
+# Reports detail throughput (overall and steady-state), per-stage
+# latency percentiles from bina.metrics, end-to-end listing latency
+# (publish → detail saved, memory queue only) and process-tree RSS
+# over time, and writes the same as JSON (--out).
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Event, Process
+from multiprocessing.managers import BaseManager
+
+import psutil
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+FIRST_ID = 9_000_000
+
+
+# ========================
+# SYNTHETIC SITE
+# ========================
+AREAS = ["Nərimanov m.", "Xətai m.", "28 May m.", "Yasamal r.", "Nəsimi r.", "Bayıl q.", "Badamdar q."]
+
+SCROLL_JS = """
+<script>
+var page = 1, loading = false, done = false;
+window.addEventListener('scroll', function () {
+  if (loading || done) return;
+  if (window.innerHeight + window.scrollY < document.body.scrollHeight - 50) return;
+  loading = true;
+  fetch('/feed/page/' + page).then(function (r) { return r.text(); }).then(function (t) {
+    if (t.trim()) { document.getElementById('items').insertAdjacentHTML('beforeend', t); page++; }
+    else { done = true; }
+    loading = false;
+  });
+});
+</script>
+"""
+
+
+def card_html(i):
+    rnd = random.Random(i)
+    lid = FIRST_ID + i
+    price = rnd.choice([98, 145, 210, 280, 365, 1250]) * 1000
+    land = i % 7 == 3
+    size = f"{rnd.randint(3, 12)} sot" if land else f"{rnd.randint(40, 220)} m²"
+    floor = "" if land else f"<span>{rnd.randint(1, 16)}/{rnd.randint(16, 25)} mərtəbə</span>"
+    agency = '<span data-cy="product-label-agency">Agentlik</span>' if i % 3 == 0 else ""
+    return (
+        f'<div data-cy="item-card" class="sc-cb70b292-0 hOgeCo">'
+        f'<a data-cy="item-card-link" href="/items/{lid}">'
+        f'<div class="sc-cb70b292-7"><span class="sc-cb70b292-9"></span></div>{agency}'
+        f'<div class="sc-cb70b292-11 price-container"><span>{price:,}</span><span>AZN</span></div>'
+        f'<span class="sc-cb70b292-15 eAsGUP">{AREAS[i % len(AREAS)]}</span>'
+        f'<ul><li><span>{rnd.randint(1, 5)} otaqlı</span></li><li><span>{size}</span></li>'
+        f'<li>{floor}</li></ul>'
+        f'<div data-cy="city_when">Bakı, bugün {rnd.randint(8, 23):02d}:{rnd.randint(0, 59):02d}</div>'
+        f'<div style="height:320px"></div></a></div>'
+    ).replace(",", " ").replace("Bakı  bugün", "Bakı, bugün")
+
+
+def detail_html(lid):
+    rnd = random.Random(lid)
+    sentences = " ".join(
+        rnd.choice(["Mənzil tam təmirlidir.", "Metroya yaxındır.", "Çıxarış var.",
+                    "Əşyalı satılır.", "Qiymətdə razılaşma mümkündür.", "Kombi quraşdırılıb."])
+        for _ in range(rnd.randint(4, 30))
+    )
+    phone = f"+99450{rnd.randint(1000000, 9999999)}"
+    return f"""<!DOCTYPE html><html lang="az"><head><meta charset="utf-8"><title>Elan {lid}</title></head>
+<body><section class="product">
+<div class="product-labels">{'<div class="product-labels__i-icon--repair"></div>Təmirli' if lid % 2 else ''}</div>
+<div id="read-more" data-cy="read-more" class="sc-639be663-0 dujDNV">{sentences}</div>
+<span class="sc-3381e952-0 iNKNZX sc-4d25592c-2 GmovA">{rnd.choice(["Cabrayıl", "Leyla", "Aydın", "Nigar"])}</span>
+<button class="js-show-phones" onclick="document.getElementById('ph').innerHTML='<a href=&quot;tel:{phone}&quot;>{phone}</a>'">Nömrəni göstər</button>
+<div id="ph" class="js-phones"></div>
+<div class="product-statistics"><span class="product-statistics__i-text">Baxışların sayı: {rnd.randint(10, 5000)}</span></div>
+</section></body></html>"""
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    items = 0
+    page_size = 24
+    latency = 0.0
+    jitter = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, body):
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def cards(self, page):
+        start = page * self.page_size
+        return "".join(card_html(i) for i in range(start, min(start + self.page_size, self.items)))
+
+    def do_GET(self):
+        if self.path == "/feed":
+            self.respond(f"<!DOCTYPE html><html lang='az'><head><meta charset='utf-8'></head>"
+                         f"<body><div id='items'>{self.cards(0)}</div>{SCROLL_JS}</body></html>")
+        elif m := re.fullmatch(r"/feed/page/(\d+)", self.path):
+            self.respond(self.cards(int(m.group(1))))
+        elif m := re.fullmatch(r"/items/(\d+)", self.path):
+            self.respond(detail_html(int(m.group(1))))
+        else:
+            self.send_error(404)
+
+
+def start_site(items, page_size, latency_ms, jitter_ms):
+    SiteHandler.items = items
+    SiteHandler.page_size = page_size
+    SiteHandler.latency = latency_ms / 1000
+    SiteHandler.jitter = jitter_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ========================
+# IN-MEMORY QUEUE STAND-IN
+# ========================
+class MemoryQueue:
+    """
+    The subset of bina.rabbit.RabbitMQ the scrapers call. Lives in a
+    manager process; consume_one blocks while the producer may still
+    publish, so detail workers don't stop on a momentarily empty queue.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.cond = threading.Condition()
+        self.finished = False
+        self.published_at = {}
+        self.latencies_ms = []
+        self.completions = {}
+
+    def publish(self, msg):
+        with self.cond:
+            self.items.append(msg)
+            self.published_at[str(msg["listing_id"])] = time.time()
+            self.cond.notify()
+
+    def publish_completion(self, listing_id, status, message="", duration_ms=None):
+        with self.cond:
+            self.completions[status] = self.completions.get(status, 0) + 1
+            t0 = self.published_at.pop(str(listing_id), None)
+            if t0 is not None and status == "success":
+                self.latencies_ms.append((time.time() - t0) * 1000)
+
+    def consume_one(self, queue_name=None):
+        with self.cond:
+            while not self.items and not self.finished:
+                self.cond.wait(1.0)
+            return self.items.pop(0) if self.items else None
+
+    def queue_depth(self, queue_name=None):
+        with self.cond:
+            return len(self.items)
+
+    def finish(self):
+        with self.cond:
+            self.finished = True
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return dict(self.completions), list(self.latencies_ms)
+
+    def close(self):
+        pass  # shared by every worker; the harness owns its lifetime
+
+
+class QueueManager(BaseManager):
+    pass
+
+
+QueueManager.register("MemoryQueue", MemoryQueue)
+
+
+# ========================
+# WORKERS (child processes)
+# ========================
+def run_producer(queue):
+    from bina import listing_producer, metrics
+    listing_producer.main(rabbit=queue)
+    metrics.flush()  # child processes exit without atexit hooks
+
+
+def run_detail(queue, producer_done):
+    from bina import detail_scraper, metrics
+    if queue is not None:
+        detail_scraper.main(rabbit=queue)
+    else:
+        # Real broker: main() stops on an empty queue, so keep
+        # restarting it until the producer is done and it drained.
+        while True:
+            detail_scraper.main()
+            if producer_done.is_set():
+                break
+            time.sleep(1)
+    metrics.flush()
+
+
+# ========================
+# DATABASE
+# ========================
+def prepare_db(setup, keep_data):
+    from bina.db import get_conn
+    from bina.migrations import migrate
+
+    if setup:
+        with open(os.path.join(ROOT, "schema.sql"), encoding="utf-8") as f:
+            schema = f.read()
+        conn = get_conn()
+        conn.autocommit = True
+        conn.cursor().execute(schema)
+        conn.close()
+        migrate()
+
+    if not keep_data:
+        conn = get_conn()
+        conn.cursor().execute("TRUNCATE bina_apartments, bina_listing_history;")
+        conn.commit()
+        conn.close()
+
+
+def scraped_count():
+    from bina.db import get_conn
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT count(*) FILTER (WHERE is_scraped), count(*) FROM bina_apartments;")
+        return cur.fetchone()
+    finally:
+        conn.close()
+
+
+# ========================
+# SAMPLING + REPORT
+# ========================
+def tree_rss_mb():
+    me = psutil.Process()
+    total = me.memory_info().rss
+    for child in me.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total / 1024 / 1024
+
+
+def sample_loop(samples, stop, every, queue, start):
+    while not stop.wait(every):
+        scraped, rows = scraped_count()
+        samples.append({
+            "t": round(time.time() - start, 1),
+            "rows": rows,
+            "scraped": scraped,
+            "queue_depth": queue.queue_depth() if queue is not None else None,
+            "rss_mb": round(tree_rss_mb(), 1),
+        })
+        s = samples[-1]
+        print(f"[SOAK] t={s['t']:>6}s rows={rows:>5} scraped={scraped:>5} "
+              f"queue={s['queue_depth']} rss={s['rss_mb']} MB")
+
+
+def steady_rate(samples):
+    """Detail rate between 10% and 90% of the final scraped count."""
+    if not samples or not samples[-1]["scraped"]:
+        return 0.0
+    final = samples[-1]["scraped"]
+    lo = next(s for s in samples if s["scraped"] >= 0.1 * final)
+    hi = next(s for s in samples if s["scraped"] >= 0.9 * final)
+    if hi["t"] <= lo["t"]:
+        return 0.0
+    return (hi["scraped"] - lo["scraped"]) / (hi["t"] - lo["t"])
+
+
+def stage_percentiles(metrics_dir):
+    from bina import metrics
+    _, histograms = metrics.collect(metrics_dir)
+    out = {}
+    for (name, labels), hist in sorted(histograms.items()):
+        if name != metrics.STAGE_SECONDS:
+            continue
+        labels = dict(labels)
+        key = f"{labels['service']}.{labels['stage']}"
+        out[key] = {
+            "count": sum(hist[:-1]),
+            "p50_ms": round(metrics.percentile(hist, 0.50) * 1000, 1),
+            "p95_ms": round(metrics.percentile(hist, 0.95) * 1000, 1),
+            "p99_ms": round(metrics.percentile(hist, 0.99) * 1000, 1),
+        }
+    return out
+
+
+def pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 1)
+
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Soak test against a synthetic bina.az")
+    parser.add_argument("--items", type=int, default=200, help="Listings in the synthetic feed")
+    parser.add_argument("--page-size", type=int, default=24, help="Cards per feed page / scroll")
+    parser.add_argument("--workers", type=int, default=2, help="Detail worker processes")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Base response delay")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="Extra random delay (uniform)")
+    parser.add_argument("--queue", choices=["memory", "rabbit"], default="memory")
+    parser.add_argument("--db-name", default="bina_soak", help="Throwaway target database")
+    parser.add_argument("--setup-db", action="store_true", help="Apply schema.sql + migrations first")
+    parser.add_argument("--keep-data", action="store_true", help="Don't truncate tables before the run")
+    parser.add_argument("--sample-every", type=float, default=5.0, help="Seconds between samples")
+    parser.add_argument("--out", help="JSON report path")
+    args = parser.parse_args()
+
+    if args.db_name == "etlserver_db":
+        sys.exit("[SOAK] Refusing to run against the production database")
+
+    server, base = start_site(args.items, args.page_size, args.latency_ms, args.jitter_ms)
+    metrics_dir = tempfile.mkdtemp(prefix="bina_soak_metrics_")
+
+    # Settings are read at import time: configure before importing bina
+    os.environ.update({
+        "DB_NAME": args.db_name,
+        "BINA_BASE_URL": f"{base}/feed",
+        "FAST_SCRAPER_LIMIT": str(args.items),
+        "BINA_SCROLL_ROUNDS_LIMIT": str(args.items // args.page_size + 2),
+        "BINA_PRODUCER_STREAMING": "1",
+        "BINA_METRICS_DIR": metrics_dir,
+        "BINA_HTML_ARCHIVE": "0",
+        "BINA_PAGE_CACHE": "0",
+    })
+    prepare_db(args.setup_db, args.keep_data)
+
+    manager = None
+    queue = None
+    if args.queue == "memory":
+        manager = QueueManager()
+        manager.start()
+        queue = manager.MemoryQueue()
+
+    print(f"[SOAK] START — {args.items} items, {args.workers} detail workers, "
+          f"latency {args.latency_ms}+{args.jitter_ms} ms, queue={args.queue}, site={base}")
+
+    start = time.time()
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_loop,
+                               args=(samples, stop, args.sample_every, queue, start), daemon=True)
+    sampler.start()
+
+    producer_done = Event()
+    producer = Process(target=run_producer, args=(queue,), name="producer")
+    workers = [Process(target=run_detail, args=(queue, producer_done), name=f"detail-{i}")
+               for i in range(args.workers)]
+    producer.start()
+    for w in workers:
+        w.start()
+
+    producer.join()
+    producer_time = time.time() - start
+    producer_done.set()
+    if queue is not None:
+        queue.finish()
+    for w in workers:
+        w.join()
+    elapsed = time.time() - start
+
+    stop.set()
+    sampler.join()
+    scraped, rows = scraped_count()
+    samples.append({"t": round(elapsed, 1), "rows": rows, "scraped": scraped,
+                    "queue_depth": 0, "rss_mb": round(tree_rss_mb(), 1)})
+
+    completions, latencies = queue.stats() if queue is not None else ({}, [])
+    rss = [s["rss_mb"] for s in samples]
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "config": vars(args),
+        "elapsed_s": round(elapsed, 1),
+        "producer_s": round(producer_time, 1),
+        "rows": rows,
+        "scraped": scraped,
+        "completions": completions,
+        "detail_per_s": round(scraped / elapsed, 3) if elapsed else 0.0,
+        "detail_per_s_steady": round(steady_rate(samples), 3),
+        "e2e_latency_ms": {"p50": pct(latencies, 0.50), "p95": pct(latencies, 0.95),
+                           "p99": pct(latencies, 0.99)},
+        "stages": stage_percentiles(metrics_dir),
+        "rss_mb": {"start": rss[0], "max": max(rss), "end": rss[-1],
+                   "mean": round(statistics.mean(rss), 1)},
+        "samples": samples,
+    }
+
+    print(f"\n[SOAK] DONE — {scraped}/{rows} listings scraped in {elapsed:.1f}s "
+          f"(producer {producer_time:.1f}s)")
+    print(f"[SOAK] Throughput: {report['detail_per_s']}/s overall, "
+          f"{report['detail_per_s_steady']}/s steady, {args.workers} workers")
+    print(f"[SOAK] End-to-end latency: {report['e2e_latency_ms']}")
+    print(f"[SOAK] RSS (MB): {report['rss_mb']}")
+    for stage, p in report["stages"].items():
+        print(f"[SOAK] {stage:36s} n={p['count']:>6}  p50={p['p50_ms']:>8} ms  "
+              f"p95={p['p95_ms']:>8} ms  p99={p['p99_ms']:>8} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[SOAK] Report written to {args.out}")
+
+    if manager is not None:
+        manager.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()